@@ -157,6 +157,10 @@ class CollaborativeFilteringEngine:
     
     async def record_interaction(self, interaction: UserInteraction):
         """Record a user interaction."""
+        await self.record_interactions([interaction])
+    
+    async def record_interactions(self, interactions: List[UserInteraction]):
+        """Record several user interactions in one pipelined Redis round trip."""
         if not self.enabled:
             logger.debug("CF disabled - skipping interaction recording")
             return
@@ -166,45 +170,50 @@ class CollaborativeFilteringEngine:
             if not self.redis_client:
                 return
             
-            # Store user interaction
-            user_key = USER_INTERACTIONS_KEY.format(user_id=interaction.user_id)
-            interaction_data = {
-                "business_id": interaction.business_id,
-                "business_name": interaction.business_name,
-                "type": interaction.interaction_type,
-                "timestamp": interaction.timestamp.isoformat(),
-                "query": interaction.query or "",
-                "category": interaction.category or "",
-                "tags": json.dumps(interaction.tags or []),
-                "rating": interaction.implicit_rating
-            }
-            
-            # Use sorted set to maintain chronological order
-            score = interaction.timestamp.timestamp()
-            await self.redis_client.zadd(user_key, {json.dumps(interaction_data): score})
-            
-            # Store business interaction
-            business_key = BUSINESS_INTERACTIONS_KEY.format(business_id=interaction.business_id)
-            business_data = {
-                "user_id": interaction.user_id,
-                "type": interaction.interaction_type,
-                "timestamp": interaction.timestamp.isoformat(),
-                "rating": interaction.implicit_rating
-            }
-            await self.redis_client.zadd(business_key, {json.dumps(business_data): score})
+            # Set expiry for data (30 days)
+            expire_time = 30 * 24 * 3600
+            pipe = self.redis_client.pipeline(transaction=False)
             
-            # Store search query if present
-            if interaction.query:
-                search_key = SEARCH_QUERIES_KEY.format(user_id=interaction.user_id)
-                await self.redis_client.zadd(search_key, {interaction.query: score})
+            for interaction in interactions:
+                # Store user interaction
+                user_key = USER_INTERACTIONS_KEY.format(user_id=interaction.user_id)
+                interaction_data = {
+                    "business_id": interaction.business_id,
+                    "business_name": interaction.business_name,
+                    "type": interaction.interaction_type,
+                    "timestamp": interaction.timestamp.isoformat(),
+                    "query": interaction.query or "",
+                    "category": interaction.category or "",
+                    "tags": json.dumps(interaction.tags or []),
+                    "rating": interaction.implicit_rating
+                }
+                
+                # Use sorted set to maintain chronological order
+                score = interaction.timestamp.timestamp()
+                pipe.zadd(user_key, {json.dumps(interaction_data): score})
+                
+                # Store business interaction
+                business_key = BUSINESS_INTERACTIONS_KEY.format(business_id=interaction.business_id)
+                business_data = {
+                    "user_id": interaction.user_id,
+                    "type": interaction.interaction_type,
+                    "timestamp": interaction.timestamp.isoformat(),
+                    "rating": interaction.implicit_rating
+                }
+                pipe.zadd(business_key, {json.dumps(business_data): score})
                 
-                # Track popular searches
-                await self.redis_client.zincrby(POPULAR_SEARCHES_KEY, 1, interaction.query)
+                # Store search query if present
+                if interaction.query:
+                    search_key = SEARCH_QUERIES_KEY.format(user_id=interaction.user_id)
+                    pipe.zadd(search_key, {interaction.query: score})
+                    
+                    # Track popular searches
+                    pipe.zincrby(POPULAR_SEARCHES_KEY, 1, interaction.query)
+                
+                pipe.expire(user_key, expire_time)
+                pipe.expire(business_key, expire_time)
             
-            # Set expiry for data (30 days)
-            expire_time = 30 * 24 * 3600
-            await self.redis_client.expire(user_key, expire_time)
-            await self.redis_client.expire(business_key, expire_time)
+            await pipe.execute()
             
         except Exception as e:
             logger.warning(f"Failed to record interaction: {e}")
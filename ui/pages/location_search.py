@@ -1,9 +1,29 @@
 import streamlit as st
 import requests
+import copy
+import hashlib
+import html
 import json
 import math
+import queue
+import re
+import threading
+import time
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from operator import itemgetter
+from requests.adapters import HTTPAdapter
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from typing import List, Dict, Any, Optional
 
+# orjson is optional; without it JSON is encoded and decoded with the stdlib json module
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Configuration
 UPLOAD_API_URL = "http://rag-app:8001"
 PATHWAY_API_URL = "http://rag-app:8000"
@@ -14,8 +34,9 @@ st.set_page_config(
     layout="wide"
 )
 
-# Custom CSS
-st.markdown("""
+# Custom CSS. The page is rebuilt on every rerun, so it has to be emitted
+# each time; keeping it a module constant avoids rebuilding the string.
+_CSS = """
 <style>
 .search-result {
     background-color: #f8f9fa;
@@ -46,6 +67,10 @@ st.markdown("""
     border-radius: 0.5rem;
     margin: 1rem 0;
 }
+.search-result summary {
+    cursor: pointer;
+    font-weight: bold;
+}
 .map-placeholder {
     background-color: #e9ecef;
     border: 2px dashed #6c757d;
@@ -56,7 +81,210 @@ st.markdown("""
     margin: 1rem 0;
 }
 </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(_CSS, unsafe_allow_html=True)
+
+# Browser geolocation component (renders in its own iframe, so it carries its own styles)
+_GEO_JS = """
+<style>
+.geo-btn { padding: 10px 20px; background: #007bff; color: white; border: none; border-radius: 5px; }
+.geo-result { margin-top: 10px; }
+</style>
+<script>
+function getLocation() {
+    if (navigator.geolocation) {
+        navigator.geolocation.getCurrentPosition(function(position) {
+            document.getElementById("lat_result").innerHTML = position.coords.latitude;
+            document.getElementById("lng_result").innerHTML = position.coords.longitude;
+            window.parent.postMessage({
+                type: 'location', 
+                lat: position.coords.latitude, 
+                lng: position.coords.longitude
+            }, '*');
+        });
+    } else {
+        alert("Geolocation is not supported by this browser.");
+    }
+}
+</script>
+<button class="geo-btn" onclick="getLocation()">🧭 Get My Location</button>
+<div class="geo-result">
+    <strong>Latitude:</strong> <span id="lat_result">Not detected</span><br>
+    <strong>Longitude:</strong> <span id="lng_result">Not detected</span>
+</div>
+"""
+
+# Static page content, built once at import
+_SEARCH_TIPS_MD = """
+**🧠 Smart Contextual Search:**
+- Uses OpenAI embeddings + time/weather context
+- Adapts suggestions to current conditions
+- "coffee shop" → boosted in morning/cold weather  
+- "restaurant" → boosted during meal times
+- Results ranked by AI relevance + context + distance
+
+**🌤️ Weather-Aware Recommendations:**
+- ☀️ Sunny: Outdoor dining, parks, ice cream
+- 🌧️ Rainy: Indoor venues, shopping malls  
+- ❄️ Cold: Coffee shops, warm food, heated places
+- 🌡️ Hot: Air-conditioned venues, cold drinks
+
+**🕒 Time-Based Intelligence:**
+- **Morning (6-11)**: Coffee shops, breakfast, gyms
+- **Lunch (12-14)**: Restaurants, fast food, cafes
+- **Afternoon (14-17)**: Shopping, services, coffee
+- **Evening (17-21)**: Dinner, entertainment, bars
+- **Night (21+)**: Late-night food, 24hr services
+
+**🤖 Collaborative Filtering:**
+- Learns from user interactions
+- Shows "Recommended for you" businesses
+- "People also searched for" suggestions
+- Tracks views, clicks, and bookmarks
+
+**🎯 Smart Examples:**
+- "lunch" at 12pm → restaurants boosted
+- "coffee" on rainy day → indoor cafes prioritized
+- "dinner" + cold weather → warm food highlighted
+- Friday evening → bars and entertainment boosted
+
+**📍 Search Options:**
+- **🌍 Unlimited Search**: ALL businesses, context-ranked
+- **📏 Limited Radius**: Nearby + contextually relevant
+- Use precise coordinates for best results
+- Weather and time automatically detected
+
+**🔧 Search Methods:**
+- **Contextual**: AI + time + weather + history (best)
+- **Vectorized**: AI-powered semantic search 
+- **CSV Fallback**: Basic text matching (backup)
+
+**💡 Pro Tips:**
+- Search is automatically optimized for current time/weather
+- Context factors shown in expandable sections
+- Bookmarking improves future recommendations
+- Weather data refreshed every 15 minutes
+"""
+
+_MAP_PLACEHOLDER_HTML = """
+<div class="map-placeholder">
+    <h3>🗺️ Interactive Map</h3>
+    <p>Map integration would show:</p>
+    <ul style="list-style: none; padding: 0;">
+        <li>📍 Your current location</li>
+        <li>🏪 Contextually ranked businesses</li>
+        <li>�️ Weather-aware markers</li>
+        <li>⏰ Time-based highlights</li>
+        <li>🎯 Smart routing suggestions</li>
+    </ul>
+    <small>Integrated with contextual recommendation engine</small>
+</div>
+"""
+
+# Result card markup. The "why recommended" factors are a native <details> inside the card
+# so each result costs one markdown element instead of a card, an expander and its body.
+_CARD_TEMPLATE = """
+<div class="search-result">
+    <h4>🏪 {business_name}</h4>
+    <p><strong>👤 Owner:</strong> {name}</p>
+    <p>
+        <span class="category-badge">{category}</span>
+        <span class="distance-badge">📏 {distance:.1f} km away</span>
+        {relevance_info}
+    </p>
+    <p><strong>📍 Location:</strong> {latitude:.4f}, {longitude:.4f}</p>
+    <p><strong>🏷️ Tags:</strong> {tags}</p>
+    {factors_html}
+</div>
+"""
+
+_FACTORS_TEMPLATE = """<details>
+        <summary>🎯 Why this business is recommended</summary>
+        <strong>Contextual factors applied:</strong>
+        <ul>{items}</ul>
+    </details>"""
+
+@st.cache_resource
+def _get_session() -> requests.Session:
+    """Shared HTTP session so API calls reuse pooled connections across reruns."""
+    session = requests.Session()
+    # One pool per API host; sized for every worker plus the script threads of
+    # concurrent sessions so sockets are reused rather than opened and discarded
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=32, max_retries=0)
+    session.mount("http://", adapter)
+    return session
+
+SESSION = _get_session()
+
+@st.cache_resource
+def _get_executor() -> ThreadPoolExecutor:
+    """Shared worker pool for network calls that can overlap with the script thread."""
+    # Each search can occupy two workers (weather and suggestions) alongside its own request
+    return ThreadPoolExecutor(max_workers=16, thread_name_prefix="location-search")
+
+EXECUTOR = _get_executor()
+
+def _submit(fn, *args, **kwargs) -> Future:
+    """Run fn on the shared pool with this script run's context attached (cached calls need it)."""
+    # A shallow copy shares the session but not the per-call flags: a cached function running on
+    # the worker would otherwise mark the script thread as inside a cache and trip its widgets
+    ctx = copy.copy(get_script_run_ctx())
+
+    def run():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*args, **kwargs)
+
+    return EXECUTOR.submit(run)
+
+@st.cache_resource
+def _post_template(url: str) -> requests.PreparedRequest:
+    """Prepared JSON POST for an endpoint; URL parsing and headers are computed once."""
+    return SESSION.prepare_request(
+        requests.Request("POST", url, headers={"Content-Type": "application/json"})
+    )
+
+def _post_json(url: str, payload: Dict[str, Any], timeout: float) -> requests.Response:
+    """POST a JSON payload using the cached template for the endpoint."""
+    prepared = _post_template(url).copy()
+    prepared.prepare_body(data=_dump_json(payload), files=None)
+    return SESSION.send(prepared, timeout=timeout)
+
+def _dump_json(payload: Any) -> bytes:
+    """Encode a request body, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode("utf-8")
+
+def _parse_json(response: requests.Response) -> Any:
+    """Decode a JSON response body, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(response.content)
+    return response.json()
+
+_PROBE_CONNECTION_ERROR = "connection_error"
+_PROBE_TIMEOUT = "timeout"
+
+def _probe(method, url: str) -> tuple:
+    """Call a status endpoint; returns (online, status_code_or_error)."""
+    try:
+        response = method(url, timeout=3)
+        return (response.status_code == 200, response.status_code)
+    except requests.exceptions.ConnectionError:
+        return (False, _PROBE_CONNECTION_ERROR)
+    except requests.exceptions.Timeout:
+        return (False, _PROBE_TIMEOUT)
+    except Exception as e:
+        return (False, str(e))
+
+@st.cache_data(ttl=15, show_spinner=False)
+def _probe_upload() -> tuple:
+    """Upload API health probe, cached so reruns don't re-hit the service."""
+    return _probe(SESSION.get, f"{UPLOAD_API_URL}/health")
+
+@st.cache_data(ttl=15, show_spinner=False)
+def _probe_pathway() -> tuple:
+    """Pathway statistics probe, cached so reruns don't re-hit the service."""
+    return _probe(SESSION.post, f"{PATHWAY_API_URL}/v1/statistics")
 
 def calculate_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
     """Calculate distance between two points using Haversine formula."""
@@ -72,6 +300,45 @@ def calculate_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> fl
     
     return distance
 
+def _user_terms(lat: float, lng: float) -> tuple:
+    """Radians and latitude cosine for the user's position, computed once per search."""
+    lat_r, lng_r = math.radians(lat), math.radians(lng)
+    return lat_r, lng_r, math.cos(lat_r)
+
+def distances_from_user(user_terms: tuple, lats_rad: np.ndarray, lngs_rad: np.ndarray, cos_lats: np.ndarray) -> np.ndarray:
+    """Haversine distances (km) from the user to coordinates already in radians."""
+    lat_r, lng_r, cos_user_lat = user_terms
+    sin_dlat_half = np.sin((lats_rad - lat_r) * 0.5)
+    sin_dlng_half = np.sin((lngs_rad - lng_r) * 0.5)
+    a = sin_dlat_half * sin_dlat_half + cos_user_lat * cos_lats * sin_dlng_half * sin_dlng_half
+    return 2 * 6371.0 * np.arctan2(np.sqrt(a), np.sqrt(np.maximum(0.0, 1.0 - a)))
+
+# For demo, provide some common city coordinates
+CITY_COORDS = {
+    "san francisco": (37.7749, -122.4194),
+    "new york": (40.7128, -74.0060),
+    "los angeles": (34.0522, -118.2437),
+    "chicago": (41.8781, -87.6298),
+    "miami": (25.7617, -80.1918)
+}
+
+# One alternation scans the address once for every known city; longest names go first so a
+# city is never shadowed by a shorter one it contains, and matching doesn't rely on the caller's case
+_CITY_RE = re.compile("|".join(map(re.escape, sorted(CITY_COORDS, key=len, reverse=True))), re.I)
+
+def geocode(address: str) -> Optional[tuple]:
+    """Resolve an address to (city, (lat, lng))."""
+    # Normalise case and whitespace so trivially different inputs share a cache entry
+    return _geocode_normalized(" ".join(address.lower().split()))
+
+@st.cache_data(ttl=3600, max_entries=2048, show_spinner=False)
+def _geocode_normalized(address: str) -> Optional[tuple]:
+    match = _CITY_RE.search(address)
+    if not match:
+        return None
+    city = match[0].lower()
+    return (city, CITY_COORDS[city])
+
 def parse_lat_lng(lat_lng_str: str) -> Optional[tuple]:
     """Parse lat,lng string into tuple of floats."""
     try:
@@ -84,57 +351,91 @@ def parse_lat_lng(lat_lng_str: str) -> Optional[tuple]:
         pass
     return None
 
+# API result fields -> display keys used by the result cards
+_RESULT_FIELDS = ("name", "business_name", "latitude", "longitude", "business_category", "business_tags", "distance_km")
+_RESULT_KEYS = ("name", "business_name", "latitude", "longitude", "category", "tags", "distance")
+_RESULT_DEFAULTS = ("", "", 0, 0, "", "", 0)
+_get_result_fields = itemgetter(*_RESULT_FIELDS)
+
+def _result_fields(business: Dict) -> tuple:
+    """Extract the display fields of an API result, defaulting any that are missing."""
+    try:
+        return _get_result_fields(business)
+    except KeyError:
+        return tuple(business.get(field, default) for field, default in zip(_RESULT_FIELDS, _RESULT_DEFAULTS))
+
+def _contextual_search(payload: Dict[str, Any]) -> Optional[Dict]:
+    """Body of a successful contextual search, or None if it failed or timed out."""
+    try:
+        response = _post_json(f"{UPLOAD_API_URL}/search-businesses/contextual", payload, 15)
+        if response.status_code == 200:
+            data = _parse_json(response)
+            if data.get("ok", False):
+                return data
+    except Exception:
+        pass
+    return None
+
+def _run_search(query: str, user_lat: float, user_lng: float, max_distance: Optional[float], user_session_id: Optional[str]) -> Dict:
+    """Run the search request and return the decoded response body."""
+    # Use the enhanced contextual search endpoint
+    payload = {
+        "user_lat": user_lat,
+        "user_lng": user_lng,
+        "query": query,
+        "limit": 100,  # Increased limit for unlimited search
+        "include_recommendations": True
+    }
+    
+    if user_session_id:
+        payload["user_session_id"] = user_session_id
+    
+    # Only add distance constraint if specified
+    if max_distance is not None:
+        payload["max_distance_km"] = max_distance
+    else:
+        # Use a very large radius for "unlimited" search
+        payload["max_distance_km"] = 20000.0  # 20,000 km (essentially unlimited on Earth)
+    
+    # Both endpoints record the search for collaborative filtering, so the regular
+    # one is only called when contextual search fails; racing them would log it twice
+    data = _contextual_search(payload)
+    
+    # Fallback to regular search if contextual not available
+    if data is None:
+        response = _post_json(f"{UPLOAD_API_URL}/search-businesses", payload, 15)
+        # Raising keeps failed responses out of the cache
+        response.raise_for_status()
+        data = _parse_json(response)
+    
+    return data
+
+@st.cache_data(ttl=60, max_entries=256, show_spinner=False)
+def _fetch_search(query: str, user_lat: float, user_lng: float, max_distance: Optional[float], user_session_id: str, _misses: list) -> Dict:
+    """Cached _run_search for searches within an established session."""
+    # Underscore args aren't hashed; the marker tells the caller this call reached the backend
+    _misses.append(True)
+    return _run_search(query, user_lat, user_lng, max_distance, user_session_id)
+
 def search_businesses(query: str, user_lat: float, user_lng: float, max_distance: Optional[float] = 10.0, user_session_id: Optional[str] = None) -> tuple[List[Dict], List[Dict], Dict, str]:
     """Search for businesses using vectorized data from Pathway with contextual recommendations."""
     try:
-        # Use the enhanced contextual search endpoint
-        payload = {
-            "user_lat": user_lat,
-            "user_lng": user_lng,
-            "query": query,
-            "limit": 100,  # Increased limit for unlimited search
-            "include_recommendations": True
-        }
-        
-        if user_session_id:
-            payload["user_session_id"] = user_session_id
-        
-        # Only add distance constraint if specified
-        if max_distance is not None:
-            payload["max_distance_km"] = max_distance
+        query = " ".join(query.split())
+        if user_session_id is None:
+            # First search of a session: always reach the backend so it records the search
+            # and hands out this session's own ids rather than a cached one's
+            data = _run_search(query, user_lat, user_lng, max_distance, None)
         else:
-            # Use a very large radius for "unlimited" search
-            payload["max_distance_km"] = 20000.0  # 20,000 km (essentially unlimited on Earth)
-        
-        # Try contextual search first
-        contextual_available = False
-        try:
-            response = requests.post(
-                f"{UPLOAD_API_URL}/search-businesses/contextual",
-                json=payload,
-                timeout=15
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("ok", False):
-                    contextual_available = True
-        except Exception:
-            contextual_available = False
-        
-        # Fallback to regular search if contextual not available
-        if not contextual_available:
-            response = requests.post(
-                f"{UPLOAD_API_URL}/search-businesses",
-                json=payload,
-                timeout=15
-            )
-        
-        if response.status_code != 200:
-            st.error(f"API Error: {response.status_code}")
-            return [], [], {}, "error"
-        
-        data = response.json()
+            # Coordinates are bucketed to ~110m and the query's whitespace collapsed so nearby or
+            # re-typed repeat searches share a cache entry. The backend applies the radius at the
+            # bucketed point, so businesses within ~80m of the edge may fall either side of it;
+            # displayed distances are recomputed below from the exact user location
+            lat_bucket, lng_bucket = round(user_lat, 3), round(user_lng, 3)
+            misses = []
+            data = _fetch_search(query, lat_bucket, lng_bucket, max_distance, user_session_id, misses)
+            if not misses and query:
+                # Served from cache, so the backend never saw this search; report it like any other interaction
+                track_business_interaction("search_query", query, "search", query=query, user_lat=lat_bucket, user_lng=lng_bucket)
         
         if not data.get("ok", False):
             st.error(f"Search failed: {data.get('error', 'Unknown error')}")
@@ -151,18 +452,32 @@ def search_businesses(query: str, user_lat: float, user_lng: float, max_distance
             st.session_state.cf_session_id = data["session_id"]
         
         # Convert to expected format
-        formatted_results = []
-        for business in results:
-            result = {
-                "name": business.get("name", ""),
-                "business_name": business.get("business_name", ""),
-                "latitude": business.get("latitude", 0),
-                "longitude": business.get("longitude", 0),
-                "category": business.get("business_category", ""),
-                "tags": business.get("business_tags", ""),
-                "distance": business.get("distance_km", 0),
-                "business_id": business.get("business_id", business.get("business_name", ""))
-            }
+        formatted_results = [dict(zip(_RESULT_KEYS, _result_fields(business))) for business in results]
+        
+        # Numeric fields as columns (SoA) so scoring runs as a few vectorized ops per search
+        count = len(formatted_results)
+        lats_rad = np.radians(np.fromiter((r["latitude"] for r in formatted_results), dtype=np.float64, count=count))
+        lngs_rad = np.radians(np.fromiter((r["longitude"] for r in formatted_results), dtype=np.float64, count=count))
+        cos_lats = np.cos(lats_rad)
+        # Recompute every distance rather than trusting the API's rounded/missing values
+        distances = distances_from_user(_user_terms(user_lat, user_lng), lats_rad, lngs_rad, cos_lats)
+        vector_scores = np.fromiter((b.get("vector_score", np.nan) for b in results), dtype=np.float64, count=count)
+        contextual_scores = np.fromiter((b.get("contextual_score", 1.0) for b in results), dtype=np.float64, count=count)
+        relevances = 1.0 / (1.0 + vector_scores)  # Convert to 0-1 scale
+        # Signed percentage: positive when context boosted the result, negative when it was reduced
+        boost_pcts = np.where(
+            contextual_scores > 1.1, ((contextual_scores - 1.0) * 100).astype(int),
+            np.where(contextual_scores < 0.9, -((1.0 - contextual_scores) * 100).astype(int), 0)
+        )
+        for result, business, distance, relevance, boost_pct in zip(
+            formatted_results, results, distances.tolist(), relevances.tolist(), boost_pcts.tolist()
+        ):
+            result["business_id"] = business.get("business_id", result["business_name"])
+            # Parsed once here; interaction tracking reuses it for views and every click
+            tags_list = [tag for tag in map(str.strip, result["tags"].split(',')) if tag] if result["tags"] else None
+            result["tags_list"] = tags_list or None
+            result["distance"] = distance
+            result["boost_pct"] = boost_pct
             
             # Add contextual search specific fields
             if "contextual_score" in business:
@@ -171,9 +486,10 @@ def search_businesses(query: str, user_lat: float, user_lng: float, max_distance
             
             if "vector_score" in business:
                 result["vector_score"] = business["vector_score"]
-                result["relevance"] = 1.0 / (1.0 + business["vector_score"])  # Convert to 0-1 scale
+                result["relevance"] = relevance
             
-            formatted_results.append(result)
+            # Pages and widget clicks re-render cards many times per search
+            result["card_html"] = _card_html(result)
         
         return formatted_results, recommendations, context_info, search_method
         
@@ -183,72 +499,129 @@ def search_businesses(query: str, user_lat: float, user_lng: float, max_distance
     except requests.exceptions.ConnectionError:
         st.error("❌ Cannot connect to search API. Please check if the service is running.")
         return [], [], {}, "connection_error"
+    except requests.exceptions.HTTPError as e:
+        st.error(f"API Error: {e.response.status_code}")
+        return [], [], {}, "error"
     except Exception as e:
         st.error(f"❌ Search error: {str(e)}")
         return [], [], {}, "error"
 
 
-def track_business_interaction(business_id: str, business_name: str, interaction_type: str, query: Optional[str] = None, category: Optional[str] = None, tags: Optional[List[str]] = None, user_lat: Optional[float] = None, user_lng: Optional[float] = None):
-    """Track user interaction with a business for collaborative filtering."""
+_TRACK_BATCH_SIZE = 50
+_TRACK_FLUSH_S = 0.5
+
+def _drain_interactions(events: queue.Queue):
+    """Post queued interactions to the tracking API in batches (runs on a daemon thread)."""
+    while True:
+        batch = [events.get()]
+        deadline = time.monotonic() + _TRACK_FLUSH_S
+        while len(batch) < _TRACK_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(events.get(timeout=remaining))
+            except queue.Empty:
+                break
+        try:
+            _post_json(f"{UPLOAD_API_URL}/interactions/track_batch", {"interactions": batch}, 5)
+        except requests.exceptions.RequestException:
+            # Silently fail for tracking - don't disrupt user experience
+            pass
+
+@st.cache_resource
+def _get_interaction_queue() -> queue.Queue:
+    """Process-wide interaction queue with a single background worker draining it."""
+    events = queue.Queue(maxsize=1000)
+    threading.Thread(target=_drain_interactions, args=(events,), daemon=True, name="interaction-tracker").start()
+    return events
+
+INTERACTIONS = _get_interaction_queue()
+
+def _enqueue_interaction(payload: Dict[str, Any]):
+    # Stamped now rather than when the batch is posted, so each event keeps its own time
+    payload["timestamp"] = datetime.now().isoformat()
     try:
-        payload = {
-            "business_id": business_id,
-            "business_name": business_name,
-            "interaction_type": interaction_type,  # 'view', 'click', 'bookmark'
-            "query": query,
-            "category": category,
-            "tags": tags,
-            "user_lat": user_lat,
-            "user_lng": user_lng
-        }
-        
-        response = requests.post(
-            f"{UPLOAD_API_URL}/interactions/track",
-            json=payload,
-            timeout=5
+        INTERACTIONS.put_nowait(payload)
+    except queue.Full:
+        # Tracking is best effort; drop events rather than block the page
+        pass
+
+
+def track_business_interaction(business_id: str, business_name: str, interaction_type: str, query: Optional[str] = None, category: Optional[str] = None, tags: Optional[List[str]] = None, user_lat: Optional[float] = None, user_lng: Optional[float] = None):
+    """Queue a user interaction with a business for collaborative filtering."""
+    _enqueue_interaction({
+        "business_id": business_id,
+        "business_name": business_name,
+        "interaction_type": interaction_type,  # 'view', 'click', 'bookmark'
+        "query": query,
+        "category": category,
+        "tags": tags,
+        "user_lat": user_lat,
+        "user_lng": user_lng
+    })
+
+
+def track_business_views(businesses: List[Dict], query: str, user_lat: float, user_lng: float):
+    """Queue result views, skipping ones already reported this session."""
+    tracked = st.session_state.setdefault("tracked_views", set())
+    for business in businesses:
+        business_id = business['business_id']
+        if (business_id, query) in tracked:
+            continue
+        tracked.add((business_id, query))
+        track_business_interaction(
+            business_id=business_id,
+            business_name=business['business_name'],
+            interaction_type='view',
+            query=query,
+            category=business.get('category'),
+            tags=business.get('tags_list'),
+            user_lat=user_lat,
+            user_lng=user_lng
         )
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            st.warning(f"Failed to track interaction: {response.status_code}")
-            return None
-            
-    except Exception as e:
-        # Silently fail for tracking - don't disrupt user experience
-        return None
 
 
-def get_trending_searches(limit: int = 10) -> List[Dict]:
+# cache_resource hands every session the same object instead of unpickling a fresh
+# copy per rerun; it is returned as a tuple so callers treat it as read-only
+@st.cache_resource(ttl=60, show_spinner=False)
+def get_trending_searches(limit: int = 10) -> tuple:
     """Get trending search queries."""
     try:
-        response = requests.get(
+        response = SESSION.get(
             f"{UPLOAD_API_URL}/recommendations/trending-searches?limit={limit}",
             timeout=5
         )
         
         if response.status_code == 200:
-            data = response.json()
+            data = _parse_json(response)
             if data.get("ok"):
-                return data.get("trending_searches", [])
+                return tuple(data.get("trending_searches", []))
         
-        return []
+        return ()
         
     except Exception as e:
-        return []
+        return ()
 
 
 def get_people_also_searched(query: str, limit: int = 5) -> List[str]:
     """Get 'People also searched for' suggestions."""
+    # The backend matches queries case-insensitively, so variants can share a cache entry
+    return _get_people_also_searched_cached(query.strip().lower(), limit)
+
+
+# Suggestions come from the same popularity data as trending, so they expire together
+@st.cache_data(ttl=60, show_spinner=False)
+def _get_people_also_searched_cached(query: str, limit: int) -> List[str]:
     try:
-        response = requests.get(
+        response = SESSION.get(
             f"{UPLOAD_API_URL}/recommendations/people-also-searched",
             params={"query": query, "limit": limit},
             timeout=5
         )
         
         if response.status_code == 200:
-            data = response.json()
+            data = _parse_json(response)
             if data.get("ok"):
                 return data.get("suggestions", [])
         
@@ -260,15 +633,22 @@ def get_people_also_searched(query: str, limit: int = 5) -> List[str]:
 
 def get_weather_info(user_lat: float, user_lng: float) -> Optional[Dict]:
     """Get current weather information for location."""
+    # Round to ~110 m so nearby positions share a cache entry
+    return _get_weather_cached(round(user_lat, 3), round(user_lng, 3))
+
+
+@st.cache_data(ttl=120, show_spinner=False)
+def _get_weather_cached(user_lat: float, user_lng: float) -> Optional[Dict]:
+    """Fetch weather for already-rounded coordinates."""
     try:
-        response = requests.get(
+        response = SESSION.get(
             f"{UPLOAD_API_URL}/weather/current",
             params={"user_lat": user_lat, "user_lng": user_lng},
             timeout=5
         )
         
         if response.status_code == 200:
-            data = response.json()
+            data = _parse_json(response)
             if data.get("ok"):
                 return data
         
@@ -278,6 +658,23 @@ def get_weather_info(user_lat: float, user_lng: float) -> Optional[Dict]:
         return None
 
 
+# Weather emoji mapping
+CONDITION_EMOJIS = {
+    "clear": "☀️",
+    "sunny": "🌞", 
+    "partly_cloudy": "⛅",
+    "cloudy": "☁️",
+    "overcast": "☁️",
+    "light_rain": "🌦️",
+    "rain": "🌧️",
+    "heavy_rain": "🌨️",
+    "thunderstorm": "⛈️",
+    "snow": "❄️",
+    "fog": "🌫️",
+    "windy": "💨",
+    "unknown": "🌤️"
+}
+
 def display_weather_card(weather_data: Dict):
     """Display weather information in a nice card format."""
     if not weather_data or not weather_data.get("ok"):
@@ -286,25 +683,8 @@ def display_weather_card(weather_data: Dict):
     weather = weather_data.get("weather", {})
     suggestions = weather_data.get("business_suggestions", {})
     
-    # Weather emoji mapping
-    condition_emojis = {
-        "clear": "☀️",
-        "sunny": "🌞", 
-        "partly_cloudy": "⛅",
-        "cloudy": "☁️",
-        "overcast": "☁️",
-        "light_rain": "🌦️",
-        "rain": "🌧️",
-        "heavy_rain": "🌨️",
-        "thunderstorm": "⛈️",
-        "snow": "❄️",
-        "fog": "🌫️",
-        "windy": "💨",
-        "unknown": "🌤️"
-    }
-    
     condition = weather.get("condition", "unknown")
-    emoji = condition_emojis.get(condition, "🌤️")
+    emoji = CONDITION_EMOJIS.get(condition, "🌤️")
     temp = weather.get("temperature_celsius", 0)
     description = weather.get("description", "Unknown")
     
@@ -366,20 +746,19 @@ def display_context_info(context_info: Dict):
                     st.write(f"• ... and {len(factors_applied) - 3} more")
 
 
-def display_contextual_business_card(business: Dict, search_query: str, user_lat: float, user_lng: float):
-    """Display a business card with contextual information."""
-    # Prepare contextual information
-    contextual_score = business.get("contextual_score", 1.0)
+_CARD_TEXT_KEYS = ("business_name", "name", "category", "tags")
+
+def _card_html(business: Dict) -> str:
+    """Card markup for a formatted result; built once per search, not on every render."""
+    boost_pct = business.get("boost_pct", 0)
     applied_factors = business.get("applied_factors", [])
     relevance_info = ""
     
     # Show contextual boost if significant
-    if contextual_score > 1.1:
-        boost_pct = int((contextual_score - 1.0) * 100)
+    if boost_pct > 0:
         relevance_info = f'<span class="category-badge" style="background: #28a745;">🚀 {boost_pct}% boosted</span>'
-    elif contextual_score < 0.9:
-        penalty_pct = int((1.0 - contextual_score) * 100)
-        relevance_info = f'<span class="category-badge" style="background: #dc3545;">⬇️ {penalty_pct}% reduced</span>'
+    elif boost_pct < 0:
+        relevance_info = f'<span class="category-badge" style="background: #dc3545;">⬇️ {-boost_pct}% reduced</span>'
     
     # Regular relevance info
     if "relevance" in business:
@@ -388,30 +767,22 @@ def display_contextual_business_card(business: Dict, search_query: str, user_lat
         if not relevance_info:  # Only show if no contextual info
             relevance_info = f'<span class="category-badge">🧠 {relevance_pct}% relevant</span>'
     
-    business_id = business.get('business_id', business['business_name'])
-    view_key = f"view_{business_id}_{hash(search_query) % 1000}"
-    bookmark_key = f"bookmark_{business_id}_{hash(search_query) % 1000}"
-    
-    st.markdown(f"""
-    <div class="search-result">
-        <h4>🏪 {business['business_name']}</h4>
-        <p><strong>👤 Owner:</strong> {business['name']}</p>
-        <p>
-            <span class="category-badge">{business['category']}</span>
-            <span class="distance-badge">📏 {business['distance']:.1f} km away</span>
-            {relevance_info}
-        </p>
-        <p><strong>📍 Location:</strong> {business['latitude']:.4f}, {business['longitude']:.4f}</p>
-        <p><strong>🏷️ Tags:</strong> {business['tags']}</p>
-    </div>
-    """, unsafe_allow_html=True)
-    
     # Show contextual factors if available
+    factors_html = ""
     if applied_factors:
-        with st.expander(f"🎯 Why this business is recommended", expanded=False):
-            st.markdown("**Contextual factors applied:**")
-            for factor in applied_factors:
-                st.write(f"• {factor}")
+        factors_html = _FACTORS_TEMPLATE.format(items="".join(f"<li>{html.escape(str(factor))}</li>" for factor in applied_factors))
+    
+    # API strings are rendered with unsafe_allow_html, so escape them before interpolating
+    escaped = {key: html.escape(str(business[key])) for key in _CARD_TEXT_KEYS}
+    return _CARD_TEMPLATE.format(**{**business, **escaped}, relevance_info=relevance_info, factors_html=factors_html)
+
+def display_contextual_business_card(business: Dict, search_query: str, widget_key: str, user_lat: float, user_lng: float):
+    """Display a business card with contextual information."""
+    business_id = business['business_id']
+    view_key = f"view_{widget_key}"
+    bookmark_key = f"bookmark_{widget_key}"
+    
+    st.markdown(business["card_html"], unsafe_allow_html=True)
     
     # Add interaction buttons
     col1, col2, col3 = st.columns([1, 1, 2])
@@ -423,7 +794,7 @@ def display_contextual_business_card(business: Dict, search_query: str, user_lat
                 interaction_type='click',
                 query=search_query,
                 category=business.get('category'),
-                tags=business.get('tags', '').split(',') if business.get('tags') else None,
+                tags=business.get('tags_list'),
                 user_lat=user_lat,
                 user_lng=user_lng
             )
@@ -437,16 +808,220 @@ def display_contextual_business_card(business: Dict, search_query: str, user_lat
                 interaction_type='bookmark',
                 query=search_query,
                 category=business.get('category'),
-                tags=business.get('tags', '').split(',') if business.get('tags') else None,
+                tags=business.get('tags_list'),
                 user_lat=user_lat,
                 user_lng=user_lng
             )
             st.success(f"🔖 Bookmarked {business['business_name']}")
 
+# The search fetches a full ranked list once; pages are sliced from it client-side
+RESULTS_PAGE_SIZE = 10
+
+def _change_results_page(page: int):
+    """Callback for the result page buttons."""
+    st.session_state.results_page = page
+
+@st.fragment
+def render_search_results():
+    """Render the last search from session state; widget clicks rerun only this fragment."""
+    (weather_future, _, results, recommendations, context_info, search_method,
+     search_query, user_lat, user_lng, max_distance) = st.session_state.last_search
+    
+    # Weather is decorative: reserve its slot above the results but fill it last
+    weather_slot = st.empty()
+    
+    # Display context information
+    if context_info:
+        display_context_info(context_info)
+    
+    if results:
+        # Show search method and success
+        distance_text = f"within {max_distance}km" if max_distance else "sorted by distance"
+    
+        if search_method == "vectorized":
+            st.success(f"✅ Found {len(results)} businesses using **smart contextual search** {distance_text}")
+            if max_distance is None:
+                st.info("🌍 **Unlimited search** - All businesses returned, ranked by AI similarity + context + distance")
+            else:
+                st.info("🧠 Results ranked by AI similarity + contextual factors + distance proximity")
+        elif search_method == "csv_only":
+            st.success(f"✅ Found {len(results)} businesses using **CSV fallback** {distance_text}")
+            if max_distance is None:
+                st.warning("⚠️ Contextual search unavailable, using basic text matching for all businesses")
+            else:
+                st.warning("⚠️ Contextual search unavailable, using basic text matching")
+        else:
+            st.success(f"✅ Found {len(results)} businesses {distance_text}")
+    
+        # Show recommendations if available
+        if recommendations:
+            st.markdown("### 🤖 Contextual Recommendations")
+            st.info("Based on time, weather, and your search patterns:")
+    
+            rec_cols = st.columns(min(len(recommendations), 3))
+            for idx, rec in enumerate(recommendations[:3]):
+                with rec_cols[idx % 3]:
+                    # Get contextual score info
+                    contextual_score = rec.get('contextual_score', 1.0)
+                    score_text = ""
+                    if contextual_score > 1.1:
+                        score_text = f"🚀 {int((contextual_score-1)*100)}% boost"
+    
+                    st.markdown(f"""
+                    <div style="background: #f0f8ff; padding: 10px; border-radius: 5px; margin: 5px 0; border-left: 4px solid #007bff;">
+                        <strong>🏪 {rec.get('business_name', 'Unknown')}</strong><br>
+                        <small>📂 {rec.get('category', '')}</small><br>
+                        <small>⭐ Score: {rec.get('recommendation_score', rec.get('contextual_score', 0)):.2f}</small><br>
+                        {f"<small style='color: #28a745;'>{score_text}</small>" if score_text else ""}
+                    </div>
+                    """, unsafe_allow_html=True)
+    
+        # Display main search results with contextual information, one page at a time
+        page_count = -(-len(results) // RESULTS_PAGE_SIZE)
+        page = min(st.session_state.get("results_page", 0), page_count - 1)
+        start = page * RESULTS_PAGE_SIZE
+        page_results = results[start:start + RESULTS_PAGE_SIZE]
+        
+        # Only the cards actually shown count as viewed
+        if 'cf_session_id' in st.session_state:
+            track_business_views(page_results, search_query, user_lat, user_lng)
+        
+        # Stable across reruns/processes (unlike hash()) so widget identities survive
+        query_key = hashlib.blake2b(search_query.encode(), digest_size=2).hexdigest()
+        for i, business in enumerate(page_results, start):
+            # Use contextual business card display
+            # Keyed by position: business ids fall back to names, which can repeat across branches
+            display_contextual_business_card(business, search_query, f"{i}_{query_key}", user_lat, user_lng)
+        
+        if page_count > 1:
+            prev_col, page_col, next_col = st.columns([1, 2, 1])
+            with prev_col:
+                st.button("⬅️ Previous", key="results_prev", disabled=page == 0,
+                          on_click=_change_results_page, args=(page - 1,))
+            with page_col:
+                st.caption(f"Page {page + 1} of {page_count} · results {start + 1}–{start + len(page_results)} of {len(results)}")
+            with next_col:
+                st.button("Next ➡️", key="results_next", disabled=page == page_count - 1,
+                          on_click=_change_results_page, args=(page + 1,))
+    
+    else:
+        if search_method == "vectorized":
+            if max_distance is None:
+                st.warning(f"😔 No businesses found for '{search_query}' in the entire contextual database")
+                st.info("💡 The smart search found no relevant matches. Try different keywords or check if businesses are registered")
+            else:
+                st.warning(f"😔 No businesses found for '{search_query}' in contextual data within {max_distance}km")
+                st.info("💡 The smart search found no relevant matches. Try different keywords or expand your search radius")
+        else:
+            if max_distance is None:
+                st.warning(f"😔 No businesses found for '{search_query}' in the entire database")
+                st.info("💡 Try using different keywords or check if businesses are registered")
+            else:
+                st.warning(f"😔 No businesses found for '{search_query}' within {max_distance}km of your location")
+                st.info("💡 Try expanding your search radius or using different keywords")
+    
+    weather_info = weather_future.result()
+    if weather_info:
+        with weather_slot.container():
+            display_weather_card(weather_info)
+
+def _pick_suggestion(suggestion: str):
+    """Use a 'people also searched' suggestion as the next query."""
+    st.session_state.suggestion_clicked = suggestion
+
+def render_people_also_searched():
+    """Show "People also searched for" suggestions for the last search."""
+    # Not part of the results fragment: a pick has to rerun the whole page to reach the query box,
+    # and as a plain button with a callback that takes one rerun instead of a fragment run plus st.rerun()
+    (_, suggestions_future, results, _, _, _, search_query, _, _, _) = st.session_state.last_search
+    if not (results and search_query):
+        return
+    people_also_searched = suggestions_future.result()
+    if people_also_searched:
+        st.markdown("### 👥 People Also Searched For")
+        cols = st.columns(len(people_also_searched))
+        for idx, suggestion in enumerate(people_also_searched):
+            with cols[idx]:
+                st.button(f"🔍 {suggestion}", key=f"suggestion_{idx}", on_click=_pick_suggestion, args=(suggestion,))
+
+def _pick_trending():
+    """Use the picked trending search as the next query, then clear the pick so it can be chosen again."""
+    st.session_state.trending_clicked = st.session_state.trending_choice
+    st.session_state.trending_choice = None
+
+# Same coordinates as the address lookup, so the two can't drift apart
+QUICK_LOCATIONS = {
+    "🌉 San Francisco": CITY_COORDS["san francisco"],
+    "🗽 New York": CITY_COORDS["new york"],
+    "🏖️ Los Angeles": CITY_COORDS["los angeles"]
+}
+_NO_QUICK_LOCATION = "—"
+
+def _refresh_status():
+    """Drop the cached probes so the status panel re-checks both services."""
+    _probe_upload.clear()
+    _probe_pathway.clear()
+
+@st.fragment
+def render_system_status():
+    """Sidebar system status; refreshing it reruns only this fragment."""
+    st.markdown("---\n## 📊 System Status")
+    
+    # Enhanced API status checks (cached for a few seconds across reruns); the Pathway
+    # probe runs on a worker so a cold check costs the slower probe, not both
+    pathway_future = _submit(_probe_pathway)
+    upload_api_online, upload_status = _probe_upload()
+    pathway_online, pathway_status = pathway_future.result()
+    
+    # Upload API
+    if upload_api_online:
+        st.success("✅ Upload API: Online")
+    elif isinstance(upload_status, int):
+        st.error(f"❌ Upload API: HTTP {upload_status}")
+    elif upload_status == _PROBE_CONNECTION_ERROR:
+        st.error("❌ Upload API: Connection refused")
+    elif upload_status == _PROBE_TIMEOUT:
+        st.warning("⏰ Upload API: Timeout")
+    else:
+        st.error(f"❌ Upload API: {upload_status}")
+    
+    # Pathway directly (more reliable than health endpoint)
+    if pathway_online:
+        st.success("✅ Pathway RAG: Online")
+        st.info("🧠 **Vectorized search enabled**")
+    elif isinstance(pathway_status, int):
+        st.error(f"❌ Pathway RAG: HTTP {pathway_status}")
+        st.warning("⚠️ Using CSV fallback only")
+    elif pathway_status == _PROBE_CONNECTION_ERROR:
+        st.error("❌ Pathway RAG: Connection refused")
+        st.warning("⚠️ Using CSV fallback only")
+    elif pathway_status == _PROBE_TIMEOUT:
+        st.warning("⏰ Pathway RAG: Timeout")
+        st.info("🔄 Service may be starting up or overloaded")
+    else:
+        st.error(f"❌ Pathway RAG: {pathway_status}")
+        st.warning("⚠️ Using CSV fallback only")
+    
+    # Overall status summary
+    if upload_api_online and pathway_online:
+        st.success("🚀 All systems operational")
+    elif upload_api_online and not pathway_online:
+        st.warning("⚠️ Partial functionality - CSV search only")
+    elif not upload_api_online and pathway_online:
+        st.info("ℹ️ Direct Pathway access available")
+    else:
+        st.error("❌ System offline")
+    
+    # The callback runs before the fragment reruns, so only this panel is re-probed
+    st.button("🔄 Refresh status", use_container_width=True, on_click=_refresh_status)
+
 # Main UI
 st.title("🗺️ Location-Based Business Search")
 st.markdown("Find businesses near your location using AI-powered search")
 
+# Single slot for page-level messages; a later write replaces an earlier one
+status = st.empty()
+
 # Sidebar
 with st.sidebar:
     st.header("🔧 Search Settings")
@@ -471,60 +1046,13 @@ with st.sidebar:
         st.info("🌍 **Unlimited search enabled** - All businesses will be returned, sorted by distance")
     
     show_map = st.checkbox("🗺️ Show Map View", value=False)
-    
-    st.markdown("---")
-    st.header("📊 System Status")
-    
-    # Enhanced API status checks
-    upload_api_online = False
-    pathway_online = False
-    
-    # Check Upload API
-    try:
-        health_response = requests.get(f"{UPLOAD_API_URL}/health", timeout=3)
-        if health_response.status_code == 200:
-            upload_api_online = True
-            st.success("✅ Upload API: Online")
-        else:
-            st.error(f"❌ Upload API: HTTP {health_response.status_code}")
-    except requests.exceptions.ConnectionError:
-        st.error("❌ Upload API: Connection refused")
-    except requests.exceptions.Timeout:
-        st.warning("⏰ Upload API: Timeout")
-    except Exception as e:
-        st.error(f"❌ Upload API: {str(e)}")
-    
-    # Check Pathway directly (more reliable than health endpoint)
-    try:
-        pathway_response = requests.post(f"{PATHWAY_API_URL}/v1/statistics", timeout=3)
-        if pathway_response.status_code == 200:
-            pathway_online = True
-            st.success("✅ Pathway RAG: Online")
-            st.info("🧠 **Vectorized search enabled**")
-        else:
-            st.error(f"❌ Pathway RAG: HTTP {pathway_response.status_code}")
-            st.warning("⚠️ Using CSV fallback only")
-    except requests.exceptions.ConnectionError:
-        st.error("❌ Pathway RAG: Connection refused")
-        st.warning("⚠️ Using CSV fallback only")
-    except requests.exceptions.Timeout:
-        st.warning("⏰ Pathway RAG: Timeout")
-        st.info("🔄 Service may be starting up or overloaded")
-    except Exception as e:
-        st.error(f"❌ Pathway RAG: {str(e)}")
-        st.warning("⚠️ Using CSV fallback only")
-    
-    # Overall status summary
-    if upload_api_online and pathway_online:
-        st.success("🚀 All systems operational")
-    elif upload_api_online and not pathway_online:
-        st.warning("⚠️ Partial functionality - CSV search only")
-    elif not upload_api_online and pathway_online:
-        st.info("ℹ️ Direct Pathway access available")
-    else:
-        st.error("❌ System offline")
 
 # Main content
+# Handle quick location selection (the picker lives in the right column, its value in session state)
+quick_location = QUICK_LOCATIONS.get(st.session_state.get("quick_location"))
+if quick_location:
+    status.success(f"📍 Location set to: {quick_location[0]}, {quick_location[1]}")
+
 col1, col2 = st.columns([2, 1])
 
 with col1:
@@ -539,124 +1067,88 @@ with col1:
         horizontal=True
     )
     
-    user_lat = user_lng = None
-    
-    if location_method == "🧭 Manual Coordinates":
-        col_lat, col_lng = st.columns(2)
-        with col_lat:
-            user_lat = st.number_input(
-                "Your Latitude", 
-                min_value=-90.0, 
-                max_value=90.0, 
-                value=37.7749,  # Default to San Francisco
-                format="%.6f"
-            )
-        with col_lng:
-            user_lng = st.number_input(
-                "Your Longitude", 
-                min_value=-180.0, 
-                max_value=180.0, 
-                value=-122.4194,  # Default to San Francisco
-                format="%.6f"
+    # Inputs are collected in a form so typing or adjusting coordinates doesn't rerun the
+    # page; the method picker stays outside because it changes which inputs are shown
+    with st.form("search_form", border=False):
+        user_lat = user_lng = None
+        
+        if location_method == "🧭 Manual Coordinates":
+            col_lat, col_lng = st.columns(2)
+            with col_lat:
+                user_lat = st.number_input(
+                    "Your Latitude", 
+                    min_value=-90.0, 
+                    max_value=90.0, 
+                    value=37.7749,  # Default to San Francisco
+                    format="%.6f"
+                )
+            with col_lng:
+                user_lng = st.number_input(
+                    "Your Longitude", 
+                    min_value=-180.0, 
+                    max_value=180.0, 
+                    value=-122.4194,  # Default to San Francisco
+                    format="%.6f"
+                )
+        
+        elif location_method == "🌐 Browser Geolocation (JS)":
+            st.markdown("""
+            <div class="location-input">
+                <strong>📱 Browser Geolocation</strong><br>
+                Click the button below to get your current location using your browser's geolocation API.
+            </div>
+            """, unsafe_allow_html=True)
+        
+            st.components.v1.html(_GEO_JS, height=150)
+        
+            # Manual fallback
+            st.markdown("**Or enter manually:**")
+            col_lat, col_lng = st.columns(2)
+            with col_lat:
+                user_lat = st.number_input("Latitude", value=None, format="%.6f", key="geo_lat")
+            with col_lng:
+                user_lng = st.number_input("Longitude", value=None, format="%.6f", key="geo_lng")
+        
+        elif location_method == "📍 City/Address Lookup":
+            address = st.text_input(
+                "Enter city or address", 
+                placeholder="e.g., San Francisco, CA or Times Square, New York"
             )
-    
-    elif location_method == "🌐 Browser Geolocation (JS)":
-        st.markdown("""
-        <div class="location-input">
-            <strong>📱 Browser Geolocation</strong><br>
-            Click the button below to get your current location using your browser's geolocation API.
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # JavaScript geolocation (simplified version)
-        geolocation_js = """
-        <script>
-        function getLocation() {
-            if (navigator.geolocation) {
-                navigator.geolocation.getCurrentPosition(function(position) {
-                    document.getElementById("lat_result").innerHTML = position.coords.latitude;
-                    document.getElementById("lng_result").innerHTML = position.coords.longitude;
-                    window.parent.postMessage({
-                        type: 'location', 
-                        lat: position.coords.latitude, 
-                        lng: position.coords.longitude
-                    }, '*');
-                });
-            } else {
-                alert("Geolocation is not supported by this browser.");
-            }
-        }
-        </script>
-        <button onclick="getLocation()" style="padding: 10px 20px; background: #007bff; color: white; border: none; border-radius: 5px;">
-            🧭 Get My Location
-        </button>
-        <div style="margin-top: 10px;">
-            <strong>Latitude:</strong> <span id="lat_result">Not detected</span><br>
-            <strong>Longitude:</strong> <span id="lng_result">Not detected</span>
-        </div>
-        """
-        
-        st.components.v1.html(geolocation_js, height=150)
-        
-        # Manual fallback
-        st.markdown("**Or enter manually:**")
-        col_lat, col_lng = st.columns(2)
-        with col_lat:
-            user_lat = st.number_input("Latitude", value=None, format="%.6f", key="geo_lat")
-        with col_lng:
-            user_lng = st.number_input("Longitude", value=None, format="%.6f", key="geo_lng")
-    
-    elif location_method == "📍 City/Address Lookup":
-        address = st.text_input(
-            "Enter city or address", 
-            placeholder="e.g., San Francisco, CA or Times Square, New York"
-        )
         
-        if address:
-            st.info("🔄 Address geocoding would be implemented here using a service like Google Maps API")
-            # For demo, provide some common city coordinates
-            city_coords = {
-                "san francisco": (37.7749, -122.4194),
-                "new york": (40.7128, -74.0060),
-                "los angeles": (34.0522, -118.2437),
-                "chicago": (41.8781, -87.6298),
-                "miami": (25.7617, -80.1918)
-            }
-            
-            for city, coords in city_coords.items():
-                if city in address.lower():
-                    user_lat, user_lng = coords
+            if address:
+                st.info("🔄 Address geocoding would be implemented here using a service like Google Maps API")
+                match = geocode(address)
+                if match:
+                    city, (user_lat, user_lng) = match
                     st.success(f"📍 Found coordinates for {city.title()}: {user_lat}, {user_lng}")
-                    break
-    
-    # Search query
-    st.subheader("🔍 What are you looking for?")
-    
-    # Handle clicked suggestions or trending searches
-    default_query = ""
-    if 'suggestion_clicked' in st.session_state:
-        default_query = st.session_state.suggestion_clicked
-        del st.session_state.suggestion_clicked
-    elif 'trending_clicked' in st.session_state:
-        default_query = st.session_state.trending_clicked
-        del st.session_state.trending_clicked
-    
-    search_query = st.text_input(
-        "",
-        value=default_query,
-        placeholder="e.g., coffee shops, restaurants, gas stations, pharmacies",
-        help="Describe what type of business you're looking for"
-    )
-    
-    # Search button
-    search_button = st.button("🔍 Search Nearby Businesses", type="primary", use_container_width=True)
+        
+        # A quick location overrides the inputs above until it is cleared
+        if quick_location:
+            user_lat, user_lng = quick_location
+        
+        # Search query
+        st.subheader("🔍 What are you looking for?")
+        
+        # Handle clicked suggestions or trending searches
+        # One-shot handoff: popping means a click is applied exactly once
+        default_query = st.session_state.pop('suggestion_clicked', None) or st.session_state.pop('trending_clicked', None) or ""
+        
+        search_query = st.text_input(
+            "",
+            value=default_query,
+            placeholder="e.g., coffee shops, restaurants, gas stations, pharmacies",
+            help="Describe what type of business you're looking for"
+        )
+        
+        # Search button
+        search_button = st.form_submit_button("🔍 Search Nearby Businesses", type="primary", use_container_width=True)
     
     # Search results
     if search_button and search_query and user_lat is not None and user_lng is not None:
-        # Get weather information first
-        weather_info = get_weather_info(user_lat, user_lng)
-        if weather_info:
-            display_weather_card(weather_info)
+        # Weather is independent of the search, so fetch it in the background
+        weather_future = _submit(get_weather_info, user_lat, user_lng)
+        # Suggestions only depend on the query, so they load while the search runs
+        suggestions_future = _submit(get_people_also_searched, search_query, limit=5)
         
         # Get session ID for tracking
         session_id = st.session_state.get('cf_session_id')
@@ -664,104 +1156,24 @@ with col1:
         with st.spinner("🔄 Searching with smart contextual recommendations..."):
             results, recommendations, context_info, search_method = search_businesses(search_query, user_lat, user_lng, max_distance, session_id)
         
-        # Display context information
-        if context_info:
-            display_context_info(context_info)
+        # A new search starts from its first page
+        st.session_state.results_page = 0
         
-        if results:
-            # Show search method and success
-            distance_text = f"within {max_distance}km" if max_distance else "sorted by distance"
-            
-            if search_method == "vectorized":
-                st.success(f"✅ Found {len(results)} businesses using **smart contextual search** {distance_text}")
-                if max_distance is None:
-                    st.info("🌍 **Unlimited search** - All businesses returned, ranked by AI similarity + context + distance")
-                else:
-                    st.info("🧠 Results ranked by AI similarity + contextual factors + distance proximity")
-            elif search_method == "csv_only":
-                st.success(f"✅ Found {len(results)} businesses using **CSV fallback** {distance_text}")
-                if max_distance is None:
-                    st.warning("⚠️ Contextual search unavailable, using basic text matching for all businesses")
-                else:
-                    st.warning("⚠️ Contextual search unavailable, using basic text matching")
-            else:
-                st.success(f"✅ Found {len(results)} businesses {distance_text}")
-            
-            # Show recommendations if available
-            if recommendations:
-                st.markdown("### 🤖 Contextual Recommendations")
-                st.info("Based on time, weather, and your search patterns:")
-                
-                rec_cols = st.columns(min(len(recommendations), 3))
-                for idx, rec in enumerate(recommendations[:3]):
-                    with rec_cols[idx % 3]:
-                        # Get contextual score info
-                        contextual_score = rec.get('contextual_score', 1.0)
-                        score_text = ""
-                        if contextual_score > 1.1:
-                            score_text = f"🚀 {int((contextual_score-1)*100)}% boost"
-                        
-                        st.markdown(f"""
-                        <div style="background: #f0f8ff; padding: 10px; border-radius: 5px; margin: 5px 0; border-left: 4px solid #007bff;">
-                            <strong>🏪 {rec.get('business_name', 'Unknown')}</strong><br>
-                            <small>📂 {rec.get('category', '')}</small><br>
-                            <small>⭐ Score: {rec.get('recommendation_score', rec.get('contextual_score', 0)):.2f}</small><br>
-                            {f"<small style='color: #28a745;'>{score_text}</small>" if score_text else ""}
-                        </div>
-                        """, unsafe_allow_html=True)
-            
-            # Display main search results with contextual information
-            for i, business in enumerate(results):
-                # Track business view interaction
-                if 'cf_session_id' in st.session_state:
-                    track_business_interaction(
-                        business_id=business.get('business_id', business['business_name']),
-                        business_name=business['business_name'],
-                        interaction_type='view',
-                        query=search_query,
-                        category=business.get('category'),
-                        tags=business.get('tags', '').split(',') if business.get('tags') else None,
-                        user_lat=user_lat,
-                        user_lng=user_lng
-                    )
-                
-                # Use contextual business card display
-                display_contextual_business_card(business, search_query, user_lat, user_lng)
-            
-            # Show "People also searched for" suggestions
-            if search_query:
-                people_also_searched = get_people_also_searched(search_query, limit=5)
-                if people_also_searched:
-                    st.markdown("### 👥 People Also Searched For")
-                    cols = st.columns(len(people_also_searched))
-                    for idx, suggestion in enumerate(people_also_searched):
-                        with cols[idx]:
-                            if st.button(f"🔍 {suggestion}", key=f"suggestion_{idx}"):
-                                # Track click and update search query
-                                st.session_state.suggestion_clicked = suggestion
-                                st.rerun()
-        
-        else:
-            if search_method == "vectorized":
-                if max_distance is None:
-                    st.warning(f"😔 No businesses found for '{search_query}' in the entire contextual database")
-                    st.info("💡 The smart search found no relevant matches. Try different keywords or check if businesses are registered")
-                else:
-                    st.warning(f"😔 No businesses found for '{search_query}' in contextual data within {max_distance}km")
-                    st.info("💡 The smart search found no relevant matches. Try different keywords or expand your search radius")
-            else:
-                if max_distance is None:
-                    st.warning(f"😔 No businesses found for '{search_query}' in the entire database")
-                    st.info("💡 Try using different keywords or check if businesses are registered")
-                else:
-                    st.warning(f"😔 No businesses found for '{search_query}' within {max_distance}km of your location")
-                    st.info("💡 Try expanding your search radius or using different keywords")
+        # Kept in session state so clicks on result widgets re-render without searching again
+        st.session_state.last_search = (weather_future, suggestions_future, results, recommendations, context_info,
+                                        search_method, search_query, user_lat, user_lng, max_distance)
     
     elif search_button:
+        missing = []
         if not search_query:
-            st.error("❌ Please enter a search query")
+            missing.append("a search query")
         if user_lat is None or user_lng is None:
-            st.error("❌ Please provide your location coordinates")
+            missing.append("your location coordinates")
+        status.error(f"❌ Please provide {' and '.join(missing)}")
+    
+    if 'last_search' in st.session_state:
+        render_search_results()
+        render_people_also_searched()
 
 with col2:
     st.header("📋 Search Tips")
@@ -770,110 +1182,51 @@ with col2:
     st.subheader("🔥 Trending Searches")
     trending_searches = get_trending_searches(limit=8)
     if trending_searches:
-        for trend in trending_searches:
-            if st.button(f"🔍 {trend['query']} ({trend['search_count']})", key=f"trending_{trend['query']}", use_container_width=True):
-                st.session_state.trending_clicked = trend['query']
-                st.rerun()
+        # One radio instead of a button per trend; the callback runs before the rerun,
+        # so the query box picks the choice up without a second st.rerun()
+        trend_labels = {trend['query']: f"🔍 {trend['query']} ({trend['search_count']})" for trend in trending_searches}
+        st.radio(
+            "🔥 Trending Searches",
+            options=list(trend_labels),
+            index=None,
+            format_func=trend_labels.__getitem__,
+            key="trending_choice",
+            on_change=_pick_trending,
+            label_visibility="collapsed"
+        )
     else:
         st.info("No trending searches available yet")
     
     st.markdown("---")
     
-    st.markdown("""
-    **🧠 Smart Contextual Search:**
-    - Uses OpenAI embeddings + time/weather context
-    - Adapts suggestions to current conditions
-    - "coffee shop" → boosted in morning/cold weather  
-    - "restaurant" → boosted during meal times
-    - Results ranked by AI relevance + context + distance
-    
-    **🌤️ Weather-Aware Recommendations:**
-    - ☀️ Sunny: Outdoor dining, parks, ice cream
-    - 🌧️ Rainy: Indoor venues, shopping malls  
-    - ❄️ Cold: Coffee shops, warm food, heated places
-    - 🌡️ Hot: Air-conditioned venues, cold drinks
-    
-    **🕒 Time-Based Intelligence:**
-    - **Morning (6-11)**: Coffee shops, breakfast, gyms
-    - **Lunch (12-14)**: Restaurants, fast food, cafes
-    - **Afternoon (14-17)**: Shopping, services, coffee
-    - **Evening (17-21)**: Dinner, entertainment, bars
-    - **Night (21+)**: Late-night food, 24hr services
-    
-    **🤖 Collaborative Filtering:**
-    - Learns from user interactions
-    - Shows "Recommended for you" businesses
-    - "People also searched for" suggestions
-    - Tracks views, clicks, and bookmarks
-    
-    **🎯 Smart Examples:**
-    - "lunch" at 12pm → restaurants boosted
-    - "coffee" on rainy day → indoor cafes prioritized
-    - "dinner" + cold weather → warm food highlighted
-    - Friday evening → bars and entertainment boosted
-    
-    **📍 Search Options:**
-    - **🌍 Unlimited Search**: ALL businesses, context-ranked
-    - **📏 Limited Radius**: Nearby + contextually relevant
-    - Use precise coordinates for best results
-    - Weather and time automatically detected
-    
-    **🔧 Search Methods:**
-    - **Contextual**: AI + time + weather + history (best)
-    - **Vectorized**: AI-powered semantic search 
-    - **CSV Fallback**: Basic text matching (backup)
-    
-    **💡 Pro Tips:**
-    - Search is automatically optimized for current time/weather
-    - Context factors shown in expandable sections
-    - Bookmarking improves future recommendations
-    - Weather data refreshed every 15 minutes
-    """)
+    # Long static help stays collapsed until asked for
+    with st.expander("📖 How smart search works", expanded=False):
+        st.markdown(_SEARCH_TIPS_MD)
     
+    # Map and quick locations share one tab strip when the map is enabled
     if show_map:
-        st.subheader("🗺️ Map View")
-        st.markdown("""
-        <div class="map-placeholder">
-            <h3>🗺️ Interactive Map</h3>
-            <p>Map integration would show:</p>
-            <ul style="list-style: none; padding: 0;">
-                <li>📍 Your current location</li>
-                <li>🏪 Contextually ranked businesses</li>
-                <li>�️ Weather-aware markers</li>
-                <li>⏰ Time-based highlights</li>
-                <li>🎯 Smart routing suggestions</li>
-            </ul>
-            <small>Integrated with contextual recommendation engine</small>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    # Quick location buttons
-    st.subheader("⚡ Quick Locations")
-    
-    if st.button("🌉 San Francisco", use_container_width=True):
-        st.session_state.quick_lat = 37.7749
-        st.session_state.quick_lng = -122.4194
-        st.rerun()
-    
-    if st.button("🗽 New York", use_container_width=True):
-        st.session_state.quick_lat = 40.7128
-        st.session_state.quick_lng = -74.0060
-        st.rerun()
+        map_tab, quick_tab = st.tabs(["🗺️ Map View", "⚡ Quick Locations"])
+        with map_tab:
+            st.markdown(_MAP_PLACEHOLDER_HTML, unsafe_allow_html=True)
+    else:
+        st.subheader("⚡ Quick Locations")
+        quick_tab = st.container()
     
-    if st.button("🏖️ Los Angeles", use_container_width=True):
-        st.session_state.quick_lat = 34.0522
-        st.session_state.quick_lng = -118.2437
-        st.rerun()
+    with quick_tab:
+        st.selectbox(
+            "⚡ Quick Locations",
+            options=[_NO_QUICK_LOCATION, *QUICK_LOCATIONS],
+            key="quick_location",
+            label_visibility="collapsed"
+        )
 
-# Handle quick location selection
-if hasattr(st.session_state, 'quick_lat') and hasattr(st.session_state, 'quick_lng'):
-    user_lat = st.session_state.quick_lat
-    user_lng = st.session_state.quick_lng
-    st.success(f"📍 Location set to: {user_lat}, {user_lng}")
+# Sidebar status is rendered last so a probe cache miss never delays the main content
+with st.sidebar:
+    render_system_status()
 
 # Footer
-st.markdown("---")
 st.markdown("""
+---
 <div style='text-align: center; color: #666; padding: 1rem;'>
     🗺️ Location-Based Search | Powered by Pathway RAG + Distance Calculation
 </div>
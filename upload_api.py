@@ -1,26 +1,43 @@
+import asyncio
 import os
 import uuid
 import csv
+import io
 import math
 import logging
 import hashlib
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
 import json
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from typing import List, Optional, Dict, Any
 
 from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel, Field
 from utils import (
     validate_coordinates,
     parse_lat_lng,
-    calculate_distance,
+    calculate_distances,
 )
-import requests
+import httpx
+import numpy as np
 import re
 
+# orjson is optional; without it Pathway payloads go through the stdlib json module
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Import collaborative filtering
 try:
     from collaborative_filtering_simple import (
@@ -51,7 +68,36 @@ except Exception as e:
     CONTEXTUAL_AVAILABLE = False
 
 
-app = FastAPI(title="Upload API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the async Pathway client for the app's lifetime."""
+    # Async handlers call Pathway through this client so a slow retrieve
+    # doesn't block the event loop for every other request
+    app.state.pathway_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        timeout=10.0,
+    )
+    try:
+        yield
+    finally:
+        await app.state.pathway_client.aclose()
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+# Search responses run to hundreds of businesses; orjson encodes them several times
+# faster than the stdlib json module FastAPI uses by default
+app = FastAPI(
+    title="Upload API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse if ORJSON_AVAILABLE else JSONResponse,
+)
 
 # Add CORS middleware to fix cross-origin requests
 app.add_middleware(
@@ -62,6 +108,10 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+# Compress larger responses (search results run to tens of KB of JSON); clients that
+# don't send Accept-Encoding: gzip still get plain bodies
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 logger = logging.getLogger("upload_api")
 logging.basicConfig(level=logging.INFO)
 
@@ -76,6 +126,12 @@ PATHWAY_HOST = os.getenv("PATHWAY_HOST", "localhost")
 PATHWAY_PORT = os.getenv("PATHWAY_PORT", "8000")
 PATHWAY_URL = f"http://{PATHWAY_HOST}:{PATHWAY_PORT}"
 
+# The indexing monitor polls with exponential backoff, from a quick first check up
+# to one poll every few seconds, for up to two minutes
+INDEXING_POLL_INITIAL_S = 0.25
+INDEXING_POLL_MAX_S = 8.0
+INDEXING_POLL_TIMEOUT_S = 120.0
+
 
 class DataRecord(BaseModel):
     name: str = Field(..., description="Business owner name")
@@ -115,6 +171,11 @@ class InteractionRequest(BaseModel):
     dwell_time_seconds: Optional[int] = Field(None, description="Time spent viewing (for rating calculation)")
     user_lat: Optional[float] = Field(None, description="User location when interacting")
     user_lng: Optional[float] = Field(None, description="User location when interacting")
+    timestamp: Optional[datetime] = Field(None, description="When the interaction happened (defaults to when it is received)")
+
+
+class InteractionBatchRequest(BaseModel):
+    interactions: List[InteractionRequest]
 
 
 class RecommendationsRequest(BaseModel):
@@ -146,6 +207,20 @@ class WeatherRequest(BaseModel):
     user_lng: float = Field(..., description="Longitude", ge=-180, le=180)
 
 
+def json_dumps_bytes(obj: Any) -> bytes:
+    """Serialize to JSON bytes, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+def json_loads(data: bytes) -> Any:
+    """Parse JSON bytes, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 def generate_user_id(request: Request) -> str:
     """Generate user ID from request headers."""
     user_agent = request.headers.get("user-agent", "unknown")
@@ -188,29 +263,33 @@ def ensure_dirs_and_csv() -> None:
     BUSINESSES_DIR.mkdir(parents=True, exist_ok=True)
 
 
+# Appends from concurrent upload requests are serialized so the CSV and its TXT
+# mirror always move together
+_append_lock = threading.Lock()
+
+
 def append_rows(rows: List[DataRecord]) -> int:
     ensure_dirs_and_csv()
-    with CSV_PATH.open("a", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        for r in rows:
-            writer.writerow(
-                [
-                    r.name,
-                    r.business_name,
-                    r.lat_long,
-                    r.business_category,
-                    r.business_tags,
-                ]
-            )
+    fields = [
+        (r.name, r.business_name, r.lat_long, r.business_category, r.business_tags)
+        for r in rows
+    ]
     # Also append to normalized TXT mirror to aid parsing during retrieval
-    with TXT_MIRROR_PATH.open("a", encoding="utf-8") as tf:
-        for r in rows:
-            coords = parse_lat_lng(r.lat_long)
-            if coords:
-                lat, lon = coords
-                tf.write(
-                    f"{r.name},{r.business_name},{lat},{lon},{r.business_category},{r.business_tags}\n"
-                )
+    mirror_lines = []
+    for r in rows:
+        coords = parse_lat_lng(r.lat_long)
+        if coords:
+            lat, lon = coords
+            mirror_lines.append(
+                f"{r.name},{r.business_name},{lat},{lon},{r.business_category},{r.business_tags}\n"
+            )
+    with _append_lock:
+        # Both files are opened once per batch and written in one call each
+        with CSV_PATH.open("a", newline="", encoding="utf-8") as f, \
+                TXT_MIRROR_PATH.open("a", encoding="utf-8") as tf:
+            # writerows keeps the per-row loop inside the C writer
+            csv.writer(f).writerows(fields)
+            tf.writelines(mirror_lines)
     # Write per-business text files to guarantee one-vector-per-business chunks
     for r in rows:
         write_business_file(r)
@@ -246,6 +325,17 @@ def write_business_file(record: DataRecord) -> Path:
     return out_path
 
 
+# One pass over a document finds every "key: value" line; the key is everything
+# before the line's first colon
+_KV_LINE_RE = re.compile(r"^([^:\n]*):(.*)$", re.MULTILINE)
+
+
+@lru_cache(maxsize=1024)
+def _normalize_kv_key(key: str) -> str:
+    """Map a raw document key like 'Business Name ' to 'business_name'."""
+    return key.strip().lower().replace(" ", "_")
+
+
 def parse_business_from_text(text: str) -> List[Dict[str, Any]]:
     """Parse business data from vectorized document text.
 
@@ -259,7 +349,8 @@ def parse_business_from_text(text: str) -> List[Dict[str, Any]]:
 
     # 0) Try JSON first (supports either a dict or a list of dicts)
     try:
-        parsed = json.loads(raw)
+        # orjson's JSONDecodeError subclasses the stdlib one caught below
+        parsed = json_loads(raw)
         candidate_items: List[Dict[str, Any]] = []
         if isinstance(parsed, dict):
             candidate_items = [parsed]
@@ -305,13 +396,9 @@ def parse_business_from_text(text: str) -> List[Dict[str, Any]]:
 
     # 1) Try key:value per-business format first
     if "business_name:" in raw and "business_category:" in raw:
-        kv: Dict[str, str] = {}
-        for line in raw.split("\n"):
-            line = line.strip()
-            if not line or ":" not in line:
-                continue
-            k, v = line.split(":", 1)
-            kv[k.strip().lower().replace(" ", "_")] = v.strip()
+        kv: Dict[str, str] = {
+            _normalize_kv_key(match[1]): match[2].strip() for match in _KV_LINE_RE.finditer(raw)
+        }
 
         business_name = kv.get("business_name")
         name = kv.get("owner_name", "")
@@ -345,15 +432,20 @@ def parse_business_from_text(text: str) -> List[Dict[str, Any]]:
             })
             return businesses
 
-    # 2) Fallback: CSV-like rows
-    for line in raw.split("\n"):
-        line = line.strip()
-        if not line:
+    # 2) Fallback: CSV-like rows, via the C csv parser so quoted fields keep their commas
+    # (e.g. the data.csv layout, where lat_long is written as "lat,lng")
+    try:
+        rows = list(csv.reader(io.StringIO(raw), skipinitialspace=True))
+    except csv.Error:
+        rows = []
+    for row in rows:
+        parts = [field.strip() for field in row]
+        if len(parts) < 5:
             continue
-        if "name,business_name,lat_long" in line.lower():
+        if parts[0].lower() == "name" and parts[1].lower() == "business_name" and parts[2].lower() == "lat_long":
             continue
-        parts = [p.strip().strip('"') for p in line.split(',')]
-        if len(parts) >= 6:
+        # A quoted "lat,lng" field means the lat_long layout, however many tag fields follow
+        if len(parts) >= 6 and "," not in parts[2]:
             name = parts[0]
             business_name = parts[1]
             latitude = parts[2]
@@ -402,7 +494,119 @@ def parse_business_from_text(text: str) -> List[Dict[str, Any]]:
     return businesses
 
 
-def search_businesses_vectorized(
+# Recent Pathway retrieve results keyed by (query, k). Retrieval only depends on the
+# query text, so repeats skip the embedding + ANN round trip; distance and filters are
+# still applied per request. Appends and index changes clear it, and entries also
+# expire, so newly indexed businesses show up.
+RETRIEVE_CACHE_TTL_S = 60
+RETRIEVE_CACHE_MAX_ENTRIES = 512
+_retrieve_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_retrieve_cache_stats = {"hits": 0, "misses": 0}
+
+
+def _get_cached_retrieve(key: tuple) -> Optional[List[Dict[str, Any]]]:
+    """Return a fresh cached retrieve result, refreshing its LRU position."""
+    entry = _retrieve_cache.get(key)
+    if entry is None or time.monotonic() - entry[0] > RETRIEVE_CACHE_TTL_S:
+        _retrieve_cache.pop(key, None)
+        _retrieve_cache_stats["misses"] += 1
+        return None
+    _retrieve_cache.move_to_end(key)
+    _retrieve_cache_stats["hits"] += 1
+    return entry[1]
+
+
+def _invalidate_retrieve_cache() -> None:
+    """Drop every cached retrieve result; called on the event loop, which owns the cache."""
+    _retrieve_cache.clear()
+
+
+def _store_retrieve(key: tuple, retrieve_data: List[Dict[str, Any]]) -> None:
+    """Cache a retrieve result, evicting the least recently used entries."""
+    _retrieve_cache[key] = (time.monotonic(), retrieve_data)
+    _retrieve_cache.move_to_end(key)
+    while len(_retrieve_cache) > RETRIEVE_CACHE_MAX_ENTRIES:
+        _retrieve_cache.popitem(last=False)
+
+
+# Locality cues, matched as plain substrings of the lowercased query in one regex pass
+_NEAR_CUES_RE = re.compile("|".join(map(re.escape, ["near me", "nearby", "closest", "around me", "near "])))
+
+
+@lru_cache(maxsize=4096)
+def _has_near_cue(query: str) -> bool:
+    """Whether the query implies locality ("near me", "closest", ...)."""
+    return _NEAR_CUES_RE.search(query.lower()) is not None
+
+
+def _ranking_weights(query: str, sort_mode: str, distance_weight: Optional[float]) -> tuple:
+    """Return the (relevance, distance) weights for a search."""
+    if sort_mode == "distance":
+        return 0.0, 1.0
+    if sort_mode == "relevance":
+        return 1.0, 0.0
+    if distance_weight is not None:
+        return max(0.0, min(1.0 - distance_weight, 1.0)), max(0.0, min(distance_weight, 1.0))
+    # Heuristic: if query implies locality, lean more on distance
+    if _has_near_cue(query or ""):
+        return 0.5, 0.5
+    return 0.7, 0.3
+
+
+def _select(businesses: List[Dict[str, Any]], distances: np.ndarray, mask: Optional[np.ndarray]) -> tuple:
+    """Keep the masked businesses and attach their rounded ``distance_km``."""
+    if mask is None:
+        kept_businesses, kept_distances = businesses, distances
+    else:
+        kept = np.flatnonzero(mask)
+        kept_businesses = [businesses[i] for i in kept.tolist()]
+        kept_distances = distances[kept]
+    # Scores use the rounded distance that is returned to clients
+    distances_km = np.array([round(d, 2) for d in kept_distances.tolist()], dtype=np.float64)
+    for business, distance_km in zip(kept_businesses, distances_km.tolist()):
+        business["distance_km"] = distance_km
+    return kept_businesses, distances_km
+
+
+def _top_k(businesses: List[Dict[str, Any]], scores: np.ndarray, limit: int) -> List[Dict[str, Any]]:
+    """Return the `limit` lowest-scoring businesses, ties in retrieval order."""
+    # Only the top `limit` need ordering: partition to find the cut-off score, then
+    # stable-sort just the entries at or below it so ties keep retrieval order
+    if limit < len(scores):
+        cutoff = np.partition(scores, limit - 1)[limit - 1]
+        top = np.flatnonzero(scores <= cutoff)
+        order = top[np.argsort(scores[top], kind="stable")][:limit]
+    else:
+        order = np.argsort(scores, kind="stable")
+    return [businesses[i] for i in order.tolist()]
+
+
+def _vector_scores(businesses: List[Dict[str, Any]]) -> np.ndarray:
+    """Return the vector scores as an array; lower is more relevant."""
+    return np.fromiter((b.get("vector_score", 1.0) for b in businesses), dtype=np.float64, count=len(businesses))
+
+
+def _finalize(
+    businesses: List[Dict[str, Any]], distances: np.ndarray, rel_w: float, dist_w: float, limit: int
+) -> List[Dict[str, Any]]:
+    """Rank an unlimited-radius search: no distance filter, normalize by the farthest hit."""
+    businesses, distances_km = _select(businesses, distances, None)
+    max_distance_in_results = distances_km.max() if len(distances_km) else 1
+    scores = rel_w * _vector_scores(businesses) + dist_w * (distances_km / max(max_distance_in_results, 1))
+    return _top_k(businesses, scores, limit)
+
+
+def _finalize_bounded(
+    businesses: List[Dict[str, Any]], distances: np.ndarray,
+    max_km: float, rel_w: float, dist_w: float, limit: int
+) -> List[Dict[str, Any]]:
+    """Rank a bounded search: drop businesses beyond `max_km`, normalize by the radius."""
+    businesses, distances_km = _select(businesses, distances, distances <= max_km)
+    scores = rel_w * _vector_scores(businesses) + dist_w * (distances_km / max(max_km, 1))
+    return _top_k(businesses, scores, limit)
+
+
+async def search_businesses_vectorized(
     query: str,
     user_lat: float,
     user_lng: float,
@@ -414,6 +618,9 @@ def search_businesses_vectorized(
     sort_mode: Optional[str] = None
 ) -> tuple[List[Dict[str, Any]], str]:
     """Search businesses using Pathway's vectorized data with location filtering."""
+    # 10,000km+ is considered "unlimited": no radius filter, wider retrieval
+    unlimited = max_distance_km >= 10000
+    
     try:
         # Step 1: Get vectorized results from Pathway
         search_query = query
@@ -426,128 +633,105 @@ def search_businesses_vectorized(
         
         # Use Pathway's retrieve endpoint for vector similarity search
         # Adjust k based on whether this is unlimited search or not
-        k_value = 200 if max_distance_km >= 10000 else 50
-        
-        retrieve_response = requests.post(
-            f"{PATHWAY_URL}/v1/retrieve",
-            json={
-                "query": search_query,
-                "k": k_value  # Get more results for unlimited search
-            },
-            timeout=10
-        )
-        
-        # print("RETRIEVED DATA for RESULTS", retrieve_response.json())
+        k_value = 200 if unlimited else 50
         
-        if retrieve_response.status_code != 200:
-            logger.error(f"Pathway retrieve failed: {retrieve_response.status_code}")
-            return [], "vectorized_error"
-        
-        retrieve_data = retrieve_response.json()
-        # print("RETRIEVED DATA", retrieve_data)
+        cache_key = (search_query, k_value)
+        retrieve_data = _get_cached_retrieve(cache_key)
+        if retrieve_data is None:
+            retrieve_response = await app.state.pathway_client.post(
+                f"{PATHWAY_URL}/v1/retrieve",
+                content=json_dumps_bytes({
+                    "query": search_query,
+                    "k": k_value  # Get more results for unlimited search
+                }),
+                headers={"Content-Type": "application/json"},
+                timeout=10
+            )
+            
+            # print("RETRIEVED DATA for RESULTS", retrieve_response.json())
+            
+            if retrieve_response.status_code != 200:
+                logger.error(f"Pathway retrieve failed: {retrieve_response.status_code}")
+                return [], "vectorized_error"
+            
+            # Retrieve responses carry up to 200 document texts; parse them with orjson if available
+            retrieve_data = json_loads(retrieve_response.content)
+            # print("RETRIEVED DATA", retrieve_data)
+            # An empty index is usually still loading, so only real results are kept
+            if retrieve_data:
+                _store_retrieve(cache_key, retrieve_data)
         
         # If Pathway returns empty data, just return empty vectorized result
         if not retrieve_data:
             logger.info("Pathway retrieve returned empty data")
             return [], "vectorized_empty"
         
-        # Step 2: Parse businesses from vectorized results
-        all_businesses = []
+        # Step 2: Parse businesses from vectorized results, removing duplicates (same
+        # business appearing multiple times) as they arrive instead of in a second pass
+        unique_businesses = {}
         for item in retrieve_data:
             text = item.get("text", "")
             metadata = item.get("metadata", {})
+            vector_score = item.get("dist", 0.0)
+            source_path = metadata.get("path", "")
             
             # Parse businesses from the text
-            businesses = parse_business_from_text(text)
-            # print("BUSINESSES", businesses)
-            
-            # Add vector similarity score to each business
-            for business in businesses:
-                business["vector_score"] = item.get("dist", 0.0)
-                business["source_path"] = metadata.get("path", "")
-            
-            all_businesses.extend(businesses)
-            # print("ALL BUSINESSES", all_businesses)
-        # Step 3: Remove duplicates (same business appearing multiple times)
-        unique_businesses = {}
-        for business in all_businesses:
-            key = f"{business['business_name']}_{business['lat_long']}"
-            if key not in unique_businesses:
-                unique_businesses[key] = business
-            else:
+            for business in parse_business_from_text(text):
+                # Add vector similarity score to each business
+                business["vector_score"] = vector_score
+                business["source_path"] = source_path
+                
+                # Tuple keys hash the existing strings instead of formatting a new one
+                key = (business["business_name"], business["lat_long"])
+                # setdefault inserts first sightings in a single dict operation
+                current = unique_businesses.setdefault(key, business)
                 # Keep the one with better vector score (lower distance = better)
-                if business["vector_score"] < unique_businesses[key]["vector_score"]:
+                if current is not business and vector_score < current["vector_score"]:
                     unique_businesses[key] = business
         
         businesses_list = list(unique_businesses.values())
         
-        # Step 4: Calculate distances and apply location filtering
-        filtered_businesses = []
-        for business in businesses_list:
-            distance = calculate_distance(
-                user_lat, user_lng,
-                business["latitude"], business["longitude"]
-            )
-            business["distance_km"] = round(distance, 2)
-            
-            # Apply distance filter only if max_distance_km is reasonable (not unlimited)
-            if max_distance_km >= 10000:  # 10,000km+ is considered "unlimited"
-                filtered_businesses.append(business)
-            elif distance <= max_distance_km:
-                filtered_businesses.append(business)
-        
-        # Step 5: Apply category and tag filters
+        # Step 3: Apply category and tag filters
+        # These cheap string checks run first so the distance math below only sees
+        # the businesses that survive them
+        count = len(businesses_list)
+        mask = None
         if category_filter:
-            filtered_businesses = [
-                b for b in filtered_businesses
-                if category_filter.lower() in b.get("business_category", "").lower()
-            ]
+            category_lower = category_filter.lower()
+            mask = np.fromiter(
+                (category_lower in b.get("business_category", "").lower() for b in businesses_list),
+                dtype=bool, count=count
+            )
         
         if tag_filters:
-            filtered_businesses = [
-                b for b in filtered_businesses
-                if any(tag.lower() in b.get("business_tags", "").lower() for tag in tag_filters)
-            ]
+            # One case-insensitive alternation scans each business's tags once, rather
+            # than lowercasing them again for every requested tag
+            tag_re = re.compile("|".join(map(re.escape, tag_filters)), re.IGNORECASE)
+            tag_mask = np.fromiter(
+                (tag_re.search(b.get("business_tags", "")) is not None for b in businesses_list),
+                dtype=bool, count=count
+            )
+            mask = tag_mask if mask is None else mask & tag_mask
         
-        # Step 6: Sort by semantic relevance + distance proximity
-        # Auto-detect distance emphasis if query contains locality cues
-        query_lower = (query or "").lower()
-        near_cues = ["near me", "nearby", "closest", "around me", "near "]
-        auto_distance_bias = any(cue in query_lower for cue in near_cues)
-
-        # Determine weights
-        if sort_mode == "distance":
-            rel_w, dist_w = 0.0, 1.0
-        elif sort_mode == "relevance":
-            rel_w, dist_w = 1.0, 0.0
-        else:
-            if distance_weight is not None:
-                rel_w = max(0.0, min(1.0 - distance_weight, 1.0))
-                dist_w = max(0.0, min(distance_weight, 1.0))
-            else:
-                # Heuristic: if query implies locality, lean more on distance
-                if auto_distance_bias:
-                    rel_w, dist_w = 0.5, 0.5
-                else:
-                    rel_w, dist_w = 0.7, 0.3
-
-        max_distance_in_results = max(b.get("distance_km", 0) for b in filtered_businesses) if filtered_businesses else 1
-
-        def sort_key(business):
-            # Lower vector_score is better; lower normalized_distance is better
-            vector_score = business.get("vector_score", 1.0)
-            distance = business.get("distance_km", 0)
-            if max_distance_km >= 10000:
-                # If essentially unlimited radius, normalize by max observed distance
-                normalized_distance = distance / max(max_distance_in_results, 1)
-            else:
-                normalized_distance = distance / max(max_distance_km, 1)
-            return rel_w * vector_score + dist_w * normalized_distance
+        if mask is not None:
+            businesses_list = [businesses_list[i] for i in np.flatnonzero(mask).tolist()]
+            count = len(businesses_list)
         
-        filtered_businesses.sort(key=sort_key)
+        # Step 4: Calculate distances
+        # Coordinates and scores are laid out as arrays (SoA) so distance, filters and
+        # ranking run as a few vectorized passes instead of per-business Python calls
+        lats = np.fromiter((b["latitude"] for b in businesses_list), dtype=np.float64, count=count)
+        lngs = np.fromiter((b["longitude"] for b in businesses_list), dtype=np.float64, count=count)
+        distances = calculate_distances(user_lat, user_lng, lats, lngs)
         
-        # Step 7: Limit results
-        limited_results = filtered_businesses[:limit]
+        # Step 5: Sort by semantic relevance + distance proximity
+        rel_w, dist_w = _ranking_weights(query, sort_mode, distance_weight)
+        
+        # Step 6: Apply the radius, rank and limit results
+        if unlimited:
+            limited_results = _finalize(businesses_list, distances, rel_w, dist_w, limit)
+        else:
+            limited_results = _finalize_bounded(businesses_list, distances, max_distance_km, rel_w, dist_w, limit)
         
         # Return vectorized results only
         if not limited_results:
@@ -555,7 +739,7 @@ def search_businesses_vectorized(
 
         return limited_results, "vectorized"
         
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Error connecting to Pathway: {e}")
         return [], "vectorized_error"
     except Exception as e:
@@ -563,18 +747,28 @@ def search_businesses_vectorized(
         return [], "error"
 
 
-def _monitor_indexing_for_csv(pathway_url: str, csv_rel_path: str) -> None:
+async def _monitor_indexing_for_csv(pathway_url: str, csv_rel_path: str) -> None:
     """Poll Pathway until the CSV is indexed; log start/finish."""
     try:
         logger.info(f"[indexing] Monitoring indexing for {csv_rel_path}...")
-        # naive polling loop
-        import time
         started_logged = False
-        for _ in range(120):  # up to ~2 minutes
+        last_digest = None
+        delay = INDEXING_POLL_INITIAL_S
+        deadline = time.monotonic() + INDEXING_POLL_TIMEOUT_S
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * 1.7, INDEXING_POLL_MAX_S)
             try:
-                resp = requests.post(f"{pathway_url}/v2/list_documents", timeout=5)
+                resp = await app.state.pathway_client.post(f"{pathway_url}/v2/list_documents", timeout=5)
                 if resp.status_code == 200:
-                    docs = resp.json()
+                    # An unchanged listing can't show a new status, so skip re-scanning it
+                    digest = hashlib.sha1(resp.content).digest()
+                    if digest == last_digest:
+                        continue
+                    last_digest = digest
+                    # The index changed, so results cached before it may be missing businesses
+                    _invalidate_retrieve_cache()
+                    docs = json_loads(resp.content)
                     for doc in docs:
                         path = doc.get("path", "") or doc.get("metadata", {}).get("path", "")
                         status = doc.get("_indexing_status") or doc.get("indexing_status")
@@ -589,14 +783,27 @@ def _monitor_indexing_for_csv(pathway_url: str, csv_rel_path: str) -> None:
                     logger.warning(f"[indexing] list_documents returned {resp.status_code}")
             except Exception as e:  # noqa: BLE001
                 logger.warning(f"[indexing] polling error: {e}")
-            time.sleep(1)
         logger.warning(f"[indexing] Timed out waiting for {csv_rel_path} to index.")
     except Exception as e:  # noqa: BLE001
         logger.error(f"[indexing] monitor error: {e}")
 
 
+# Running monitor tasks by path; holding them here also keeps them from being
+# garbage-collected mid-poll
+_indexing_monitors: Dict[str, "asyncio.Task[None]"] = {}
+
+
+def _start_indexing_monitor(csv_rel_path: str) -> None:
+    """Start a background indexing monitor unless one is already polling this path."""
+    if csv_rel_path in _indexing_monitors:
+        return
+    task = asyncio.create_task(_monitor_indexing_for_csv(PATHWAY_URL, csv_rel_path))
+    _indexing_monitors[csv_rel_path] = task
+    task.add_done_callback(lambda _: _indexing_monitors.pop(csv_rel_path, None))
+
+
 @app.post("/append-csv")
-def append_csv(record: DataRecord):
+async def append_csv(record: DataRecord):
     """Add a single business record to the CSV file."""
     try:
         # Validate coordinates
@@ -608,14 +815,11 @@ def append_csv(record: DataRecord):
         if not validate_coordinates(lat, lng):
             raise ValueError("Invalid coordinates. Latitude must be -90 to 90, longitude must be -180 to 180")
         
-        count = append_rows([record])
+        # File writes stay off the event loop
+        count = await run_in_threadpool(append_rows, [record])
+        _invalidate_retrieve_cache()
         # Kick off indexing monitor in background
-        import threading as _t
-        _t.Thread(
-            target=_monitor_indexing_for_csv,
-            args=(PATHWAY_URL, "businesses"),
-            daemon=True,
-        ).start()
+        _start_indexing_monitor("businesses")
 
         return {
             "ok": True, 
@@ -627,28 +831,41 @@ def append_csv(record: DataRecord):
         return JSONResponse(status_code=400, content={"ok": False, "error": str(e)})
 
 
+def _validate_batch_coordinates(records: List[DataRecord]) -> None:
+    """Raise ValueError naming the first record with a bad lat_long."""
+    # Well-formed batches are checked in one NumPy pass; anything it can't parse or
+    # that fails the bounds check is re-walked per record for the exact error
+    if records:
+        try:
+            parts = np.char.partition(np.array([r.lat_long for r in records]), ",")
+            lats = parts[:, 0].astype(np.float64)
+            lngs = parts[:, 2].astype(np.float64)
+            if ((np.abs(lats) <= 90) & (np.abs(lngs) <= 180)).all():
+                return
+        except ValueError:
+            pass
+
+    for i, record in enumerate(records):
+        coords = parse_lat_lng(record.lat_long)
+        if not coords:
+            raise ValueError(f"Record {i+1}: Invalid lat_long format. Use 'latitude,longitude'")
+        
+        lat, lng = coords
+        if not validate_coordinates(lat, lng):
+            raise ValueError(f"Record {i+1}: Invalid coordinates")
+
+
 @app.post("/append-csv/batch")
-def append_csv_batch(payload: BatchPayload):
+async def append_csv_batch(payload: BatchPayload):
     """Add multiple business records to the CSV file."""
     try:
         # Validate all records first
-        for i, record in enumerate(payload.records):
-            coords = parse_lat_lng(record.lat_long)
-            if not coords:
-                raise ValueError(f"Record {i+1}: Invalid lat_long format. Use 'latitude,longitude'")
-            
-            lat, lng = coords
-            if not validate_coordinates(lat, lng):
-                raise ValueError(f"Record {i+1}: Invalid coordinates")
+        _validate_batch_coordinates(payload.records)
         
-        count = append_rows(payload.records)
+        count = await run_in_threadpool(append_rows, payload.records)
+        _invalidate_retrieve_cache()
         # Kick off indexing monitor in background
-        import threading as _t
-        _t.Thread(
-            target=_monitor_indexing_for_csv,
-            args=(PATHWAY_URL, "businesses"),
-            daemon=True,
-        ).start()
+        _start_indexing_monitor("businesses")
         return {"ok": True, "appended": count, "csv_path": str(CSV_PATH)}
     except Exception as e:
         return JSONResponse(status_code=400, content={"ok": False, "error": str(e)})
@@ -658,16 +875,12 @@ def append_csv_batch(payload: BatchPayload):
 async def search_businesses(request: LocationSearchRequest, http_request: Request):
     """Search for businesses using vectorized data from Pathway with location filtering and collaborative filtering."""
     try:
-        # Validate user coordinates
-        if not validate_coordinates(request.user_lat, request.user_lng):
-            raise HTTPException(status_code=400, detail="Invalid user coordinates")
-        
         # Generate user ID and session ID
         user_id = generate_user_id(http_request)
         session_id = request.user_session_id or generate_session_id()
         
         # Use vectorized search from Pathway
-        results, search_method = search_businesses_vectorized(
+        results, search_method = await search_businesses_vectorized(
             query=request.query or "business",
             user_lat=request.user_lat,
             user_lng=request.user_lng,
@@ -747,14 +960,14 @@ async def health_check():
     
     # Try statistics endpoint (this is the main Pathway endpoint that works)
     try:
-        pathway_response = requests.post(f"{PATHWAY_URL}/v1/statistics", timeout=3)
+        pathway_response = await app.state.pathway_client.post(f"{PATHWAY_URL}/v1/statistics", timeout=3)
         if pathway_response.status_code == 200:
             pathway_status = "online"
         else:
             pathway_status = "error"
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         pathway_status = "offline"
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         pathway_status = "timeout"
     except Exception as e:
         pathway_status = f"error: {str(e)[:50]}"
@@ -808,7 +1021,7 @@ async def track_interaction(interaction_req: InteractionRequest, request: Reques
             business_id=interaction_req.business_id,
             business_name=interaction_req.business_name,
             interaction_type=interaction_req.interaction_type,
-            timestamp=datetime.now(),
+            timestamp=interaction_req.timestamp or datetime.now(),
             query=interaction_req.query,
             category=interaction_req.category,
             tags=interaction_req.tags,
@@ -835,6 +1048,57 @@ async def track_interaction(interaction_req: InteractionRequest, request: Reques
         )
 
 
+@app.post("/interactions/track_batch")
+async def track_interactions_batch(batch_req: InteractionBatchRequest, request: Request):
+    """Track several interactions (e.g. result views) from one request."""
+    if not CF_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Collaborative filtering not available")
+    
+    try:
+        user_id = generate_user_id(request)
+        session_id = generate_session_id()
+        timestamp = datetime.now()
+        
+        interactions = []
+        for interaction_req in batch_req.interactions:
+            rating = cf_engine.calculate_implicit_rating(
+                interaction_req.interaction_type, 
+                interaction_req.dwell_time_seconds
+            )
+            interactions.append(UserInteraction(
+                user_id=user_id,
+                business_id=interaction_req.business_id,
+                business_name=interaction_req.business_name,
+                interaction_type=interaction_req.interaction_type,
+                # Stamped per event so identical events in one batch stay distinct history entries
+                timestamp=interaction_req.timestamp or timestamp,
+                query=interaction_req.query,
+                category=interaction_req.category,
+                tags=interaction_req.tags,
+                location=(interaction_req.user_lat, interaction_req.user_lng) if interaction_req.user_lat and interaction_req.user_lng else None,
+                session_id=session_id,
+                implicit_rating=rating
+            ))
+        
+        # One pipelined write for the whole batch
+        await cf_engine.record_interactions(interactions)
+        
+        return {
+            "ok": True,
+            "user_id": user_id,
+            "session_id": session_id,
+            "tracked": len(interactions),
+            "message": "Interactions tracked successfully"
+        }
+        
+    except Exception as e:
+        logger.error(f"Failed to track interactions: {e}")
+        return JSONResponse(
+            status_code=500, 
+            content={"ok": False, "error": f"Failed to track interactions: {str(e)}"}
+        )
+
+
 @app.post("/recommendations")
 async def get_recommendations(req: RecommendationsRequest, request: Request):
     """Get collaborative filtering recommendations for a user."""
@@ -939,6 +1203,19 @@ async def get_cf_analytics():
         )
 
 
+@app.get("/analytics/retrieve-cache")
+async def get_retrieve_cache_stats():
+    """Get hit/miss counters for the Pathway retrieve cache."""
+    return {
+        "ok": True,
+        "entries": len(_retrieve_cache),
+        "max_entries": RETRIEVE_CACHE_MAX_ENTRIES,
+        "ttl_seconds": RETRIEVE_CACHE_TTL_S,
+        **_retrieve_cache_stats,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
 # Contextual Recommendations Endpoints
 
 @app.post("/recommendations/contextual")
@@ -948,10 +1225,6 @@ async def get_contextual_recommendations(req: ContextualRecommendationsRequest,
         raise HTTPException(status_code=503, detail="Contextual recommendations not available")
     
     try:
-        # Validate user coordinates
-        if not validate_coordinates(req.user_lat, req.user_lng):
-            raise HTTPException(status_code=400, detail="Invalid user coordinates")
-        
         # Generate user ID
         user_id = generate_user_id(request)
         session_id = req.user_session_id or generate_session_id()
@@ -1032,16 +1305,12 @@ async def get_current_weather(user_lat: float, user_lng: float):
 async def search_businesses_contextual(request: LocationSearchRequest, http_request: Request):
     """Enhanced business search with contextual recommendations."""
     try:
-        # Validate user coordinates
-        if not validate_coordinates(request.user_lat, request.user_lng):
-            raise HTTPException(status_code=400, detail="Invalid user coordinates")
-        
         # Generate user ID and session ID
         user_id = generate_user_id(http_request)
         session_id = request.user_session_id or generate_session_id()
         
         # Get regular search results
-        results, search_method = search_businesses_vectorized(
+        results, search_method = await search_businesses_vectorized(
             query=request.query or "business",
             user_lat=request.user_lat,
             user_lng=request.user_lng,
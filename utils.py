@@ -1,8 +1,13 @@
 import math
 import csv
+import numpy as np
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 
+# Radius of Earth in kilometers
+EARTH_RADIUS_KM = 6371
+
 def calculate_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
     """
     Calculate the distance between two geographic points using the Haversine formula.
@@ -14,21 +19,95 @@ def calculate_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> fl
     Returns:
         Distance in kilometers
     """
+    return _rank_key_to_km(_haversine_rank_key(lat1, lng1, lat2, lng2))
+
+def _haversine_rank_key(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """
+    Haversine term ``a`` for two points, without the final sqrt/asin.
+    
+    The distance is monotonic in ``a``, so it is enough for ranking or
+    thresholding by proximity; ``_rank_key_to_km`` converts it to kilometers.
+    """
     # Convert latitude and longitude from degrees to radians
     lat1, lng1, lat2, lng2 = map(math.radians, [lat1, lng1, lat2, lng2])
     
-    # Haversine formula
     dlat = lat2 - lat1
     dlng = lng2 - lng1
     
-    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlng/2)**2
-    c = 2 * math.asin(math.sqrt(a))
+    sin_dlat_half = math.sin(dlat * 0.5)
+    sin_dlng_half = math.sin(dlng * 0.5)
+    return sin_dlat_half * sin_dlat_half + math.cos(lat1) * math.cos(lat2) * sin_dlng_half * sin_dlng_half
+
+def _rank_key_to_km(a: float) -> float:
+    """Convert a haversine term from ``_haversine_rank_key`` to kilometers."""
+    # atan2 form: stays well-conditioned near antipodes, where rounding can push ``a`` just past 1
+    return EARTH_RADIUS_KM * 2 * math.atan2(math.sqrt(a), math.sqrt(max(0.0, 1.0 - a)))
+
+def calculate_distances(user_lat: float, user_lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """
+    Vectorized Haversine distance from one point to many.
     
-    # Radius of Earth in kilometers
-    R = 6371
-    distance = R * c
+    Args:
+        user_lat, user_lng: Latitude and longitude of the reference point
+        lats, lngs: Latitudes and longitudes of the other points
     
-    return distance
+    Returns:
+        Array of distances in kilometers
+    """
+    if len(lats) < NUMBA_MAX_POINTS:
+        haversine_many = _compiled_haversine_many()
+        if haversine_many is not None:
+            out = np.empty(len(lats), dtype=np.float64)
+            haversine_many(user_lat, user_lng, np.asarray(lats, dtype=np.float64), np.asarray(lngs, dtype=np.float64), out)
+            return out
+    return _rank_keys_to_km(_haversine_rank_keys(user_lat, user_lng, lats, lngs))
+
+# Below this many points NumPy's temporaries cost more than the trig itself, so a
+# compiled loop wins; larger batches stay on the vectorized path
+NUMBA_MAX_POINTS = 64
+
+def _haversine_many(user_lat, user_lng, lats, lngs, out):
+    """One-to-many Haversine loop, same formula as ``calculate_distances``; compiled by numba."""
+    lat1 = math.radians(user_lat)
+    lng1 = math.radians(user_lng)
+    cos_lat1 = math.cos(lat1)
+    for i in range(lats.shape[0]):
+        lat2 = math.radians(lats[i])
+        sin_dlat_half = math.sin((lat2 - lat1) * 0.5)
+        sin_dlng_half = math.sin((math.radians(lngs[i]) - lng1) * 0.5)
+        a = sin_dlat_half * sin_dlat_half + cos_lat1 * math.cos(lat2) * sin_dlng_half * sin_dlng_half
+        out[i] = EARTH_RADIUS_KM * 2 * math.atan2(math.sqrt(a), math.sqrt(max(0.0, 1.0 - a)))
+
+@lru_cache(maxsize=None)
+def _compiled_haversine_many():
+    """
+    Numba build of ``_haversine_many``, made on the first small batch.
+    
+    Numba is optional and slow to import, so importers of this module that never
+    hit the small-batch path don't pay for it.
+    
+    Returns:
+        The compiled function, or None when numba is not installed
+    """
+    try:
+        from numba import njit
+    except ImportError:
+        return None
+    return njit(cache=True)(_haversine_many)
+
+def _haversine_rank_keys(user_lat: float, user_lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Array form of ``_haversine_rank_key`` for one point against many."""
+    lat1, lng1 = math.radians(user_lat), math.radians(user_lng)
+    lats = np.radians(np.asarray(lats, dtype=np.float64))
+    lngs = np.radians(np.asarray(lngs, dtype=np.float64))
+    
+    sin_dlat_half = np.sin((lats - lat1) * 0.5)
+    sin_dlng_half = np.sin((lngs - lng1) * 0.5)
+    return sin_dlat_half * sin_dlat_half + math.cos(lat1) * np.cos(lats) * sin_dlng_half * sin_dlng_half
+
+def _rank_keys_to_km(a: np.ndarray) -> np.ndarray:
+    """Array form of ``_rank_key_to_km``."""
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(np.maximum(0.0, 1.0 - a)))
 
 def parse_lat_lng(lat_lng_str: str) -> Optional[Tuple[float, float]]:
     """
@@ -40,15 +119,22 @@ def parse_lat_lng(lat_lng_str: str) -> Optional[Tuple[float, float]]:
     Returns:
         Tuple of (latitude, longitude) or None if parsing fails
     """
+    if not isinstance(lat_lng_str, str):
+        return None
+    return _parse_lat_lng_cached(lat_lng_str)
+
+# Upload paths parse each record's lat_long several times (validation, TXT mirror,
+# per-business file), so a batch-sized cache turns the repeats into lookups
+@lru_cache(maxsize=1024)
+def _parse_lat_lng_cached(lat_lng_str: str) -> Optional[Tuple[float, float]]:
+    lat, sep, lng = lat_lng_str.partition(',')
+    if not sep:
+        return None
+    # float() ignores surrounding whitespace, and a second comma fails the lng parse
     try:
-        parts = lat_lng_str.strip().split(',')
-        if len(parts) == 2:
-            lat = float(parts[0].strip())
-            lng = float(parts[1].strip())
-            return (lat, lng)
-    except (ValueError, AttributeError):
-        pass
-    return None
+        return (float(lat), float(lng))
+    except ValueError:
+        return None
 
 def read_csv_businesses(csv_path: Path) -> List[Dict[str, Any]]:
     """